@@ -0,0 +1,234 @@
+"""Run the dashboard pipeline headlessly and report every stage as JSON.
+
+    python -m benchmarks.run --rows 10000 100000 1000000 --output bench.json
+
+Each row count runs in its own fresh process with empty caches, so reads
+are cold and one case's peak memory does not carry into the next. Stages
+cover the read (hashing, parsing, type detection, cache writes), the KPIs,
+each chart's aggregation, figure build and JSON payload, both exports and a
+warm re-read from the on-disk cache. Sheets of multi-sheet workbooks are
+parsed in worker processes whose memory is not included.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from .synthetic import workbook_path
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StageRecorder:
+    """Time, RSS and optionally Python heap peak for each named stage."""
+
+    def __init__(self, trace_heap=False):
+        from dashboard.profiling import peak_rss_bytes, rss_bytes
+
+        self._rss = rss_bytes
+        self._peak_rss = peak_rss_bytes
+        self.trace_heap = trace_heap
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        info = {}
+        if self.trace_heap:
+            tracemalloc.reset_peak()
+        rss_before = self._rss()
+        started = time.perf_counter()
+        yield info
+        record = {
+            'stage': name,
+            'seconds': round(time.perf_counter() - started, 4),
+            'rss_delta_mb': round((self._rss() - rss_before) / 1024 / 1024, 1),
+            'peak_rss_mb': round(self._peak_rss() / 1024 / 1024, 1),
+        }
+        if self.trace_heap:
+            record['heap_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+        record.update(info)
+        self.stages.append(record)
+
+
+def _chart_stages(recorder, dataset):
+    from dashboard import charts
+    from dashboard.timeseries import resolve_frequency
+
+    schema = dataset.schema
+    date_col = schema.date_cols[0] if schema.date_cols else None
+    # The dashboard's default selection: the first two numeric columns
+    numeric = schema.numeric_cols[:2]
+    category = 'Category' if 'Category' in schema.categorical_cols else \
+        (schema.categorical_cols[0] if schema.categorical_cols else None)
+
+    builders = [('data_types', lambda: [charts.dtype_pie(dataset, "Data Types")])]
+    if date_col and numeric:
+        builders.append(('time_series', lambda: [charts.time_series_figure(
+            dataset, date_col, numeric, resolve_frequency(dataset, date_col, "Auto"), "Trend"
+        )]))
+    if numeric:
+        builders.append(('distributions', lambda: [
+            charts.histogram(dataset, numeric[0], "Histogram"), charts.box(dataset, numeric[0], "Box")
+        ]))
+    if len(schema.numeric_cols) > 1:
+        builders.append(('correlations', lambda: [
+            charts.correlation_heatmap(dataset, schema.numeric_cols, "Correlation")
+        ]))
+    if category:
+        builders.append(('categories', lambda: [charts.top_categories_bar(dataset, category, "Top")] + (
+            [charts.category_means_bar(dataset, category, numeric[0], "Average")] if numeric else []
+        )))
+
+    for name, build in builders:
+        with recorder.stage(f"chart:{name}") as info:
+            info['payload_bytes'] = sum(len(fig.to_json()) for fig in build())
+
+
+def run_case(case):
+    """Run the pipeline once on ``case['path']``; called in a fresh process."""
+    os.environ['DASHBOARD_CACHE_DIR'] = case['cache_dir']
+    os.environ['DASHBOARD_QUERY_BACKEND'] = case['backend']
+    # Imported only now, once the settings for this case are in the environment
+    from dashboard import aggregates, exports, profiling
+    from dashboard.ingest import load_datasets
+    from dashboard.registry import REGISTRY
+
+    if case['trace_heap']:
+        tracemalloc.start()
+    recorder = StageRecorder(case['trace_heap'])
+    run = profiling.start_run()
+    files = [(os.path.basename(case['path']), open(case['path'], 'rb').read())]
+
+    with recorder.stage('read') as info:
+        dataset = load_datasets(files, all_sheets=True)
+        info['rows'] = len(dataset.df)
+        info['dataset_mb'] = round(dataset.nbytes / 1024 / 1024, 2)
+
+    with recorder.stage('kpis'):
+        dataset.summary.missing
+        aggregates.duplicate_rows(dataset)
+        aggregates.memory_usage_mb(dataset)
+        dataset.summary.mean_of_means(dataset.schema.numeric_cols)
+
+    _chart_stages(recorder, dataset)
+
+    for fmt, write in (('csv', exports.write_csv), ('xlsx', exports.write_xlsx)):
+        with recorder.stage(f"export:{fmt}") as info:
+            if fmt == 'xlsx' and len(dataset.df) + 1 > exports.EXCEL_MAX_ROWS:
+                info['skipped'] = "over the Excel row limit"
+                continue
+            path = os.path.join(case['cache_dir'], f"export.{fmt}")
+            write(dataset.df, path, lambda fraction: None)
+            info['file_mb'] = round(os.path.getsize(path) / 1024 / 1024, 2)
+
+    # Same file again, from the memory-mapped Arrow copy instead of Excel
+    REGISTRY.clear()
+    aggregates.AGGREGATE_CACHE.clear()
+    aggregates.INDEX_CACHE.clear()
+    with recorder.stage('warm_read'):
+        load_datasets(files, all_sheets=True)
+
+    engine = {}
+    for record in profiling.finish_run(run)['stages']:
+        engine[record['stage']] = round(engine.get(record['stage'], 0.0) + record['seconds'], 4)
+    return {
+        'stages': recorder.stages,
+        'engine_stages': engine,
+        'peak_rss_mb': round(profiling.peak_rss_bytes() / 1024 / 1024, 1),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _versions():
+    import numpy
+    import pandas
+
+    return {
+        'python': platform.python_version(),
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000],
+                        help="row counts to run, one case each (default: 10000 100000)")
+    parser.add_argument('--cols', type=int, default=5, help="columns, at least 5 (default: 5)")
+    parser.add_argument('--cardinality', type=int, default=20,
+                        help="distinct Category values (default: 20)")
+    parser.add_argument('--null-rate', type=float, default=0.0,
+                        help="share of blank cells outside Date (default: 0)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--backend', choices=['pandas', 'duckdb'], default='pandas')
+    parser.add_argument('--trace-heap', action='store_true',
+                        help="also report the Python heap peak per stage (slower)")
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), 'dashboard-bench'),
+                        help="where generated workbooks are kept between runs")
+    parser.add_argument('--output', help="JSON file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    result = {
+        'commit': _git_commit(),
+        'started': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'environment': _versions(),
+        'cases': [],
+    }
+    context = multiprocessing.get_context('spawn')
+    for rows in args.rows:
+        params = {
+            'rows': rows,
+            'cols': args.cols,
+            'cardinality': args.cardinality,
+            'null_rate': args.null_rate,
+            'seed': args.seed,
+        }
+        print(f"Preparing workbook with {rows:,} rows", file=sys.stderr)
+        started = time.perf_counter()
+        path = workbook_path(args.workdir, **params)
+        generate_seconds = round(time.perf_counter() - started, 2)
+
+        print(f"Running pipeline on {rows:,} rows", file=sys.stderr)
+        with tempfile.TemporaryDirectory(prefix='dashboard-bench-cache-') as cache_dir:
+            case = {
+                'path': path,
+                'cache_dir': cache_dir,
+                'backend': args.backend,
+                'trace_heap': args.trace_heap,
+            }
+            with context.Pool(1) as pool:
+                outcome = pool.apply(run_case, (case,))
+        result['cases'].append({
+            'params': dict(params, backend=args.backend),
+            'workbook_mb': round(os.path.getsize(path) / 1024 / 1024, 2),
+            'generate_seconds': generate_seconds,
+            **outcome,
+        })
+
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
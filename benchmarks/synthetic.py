@@ -0,0 +1,75 @@
+"""Synthetic supermarket workbooks shaped like the example data.
+
+Columns follow the sample shown before any upload (Date, Sales, Quantity,
+Category, Region), plus ``Metric_<n>`` floats up to the requested column
+count. Workbooks above the Excel row limit are split over several sheets.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+EXCEL_MAX_DATA_ROWS = 1048575
+REGIONS = ['North', 'South', 'East', 'West', 'Central']
+BASE_COLUMNS = ['Date', 'Sales', 'Quantity', 'Category', 'Region']
+
+
+def generate_frame(rows, cols=5, cardinality=20, null_rate=0.0, seed=0):
+    """A frame of ``rows`` sales records with ``cols`` columns (at least 5).
+
+    Categories follow a Zipf-like popularity curve over ``cardinality``
+    labels. Every column but Date is blanked at ``null_rate``.
+    """
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2022-01-01T00:00')
+    minutes = rng.integers(0, 3 * 365 * 24 * 60, rows)
+    weights = 1.0 / np.arange(1, cardinality + 1)
+    weights /= weights.sum()
+    categories = np.array([f"Category {i:04d}" for i in range(cardinality)], dtype=object)
+
+    data = {
+        'Date': pd.to_datetime(start + minutes.astype('timedelta64[m]')).floor('h'),
+        'Sales': np.round(rng.lognormal(6.5, 0.8, rows), 2),
+        'Quantity': rng.poisson(12, rows),
+        'Category': categories[rng.choice(cardinality, rows, p=weights)],
+        'Region': np.array(REGIONS, dtype=object)[rng.integers(0, len(REGIONS), rows)],
+    }
+    for n in range(1, max(cols, len(BASE_COLUMNS)) - len(BASE_COLUMNS) + 1):
+        data[f'Metric_{n}'] = np.round(rng.normal(100, 25, rows), 3)
+    df = pd.DataFrame(data)
+
+    if null_rate > 0:
+        for col in df.columns[1:]:
+            df[col] = df[col].mask(rng.random(rows) < null_rate)
+    return df
+
+
+def write_workbook(df, path):
+    """Write ``df`` as .xlsx with openpyxl's write-only mode."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for number, start in enumerate(range(0, max(len(df), 1), EXCEL_MAX_DATA_ROWS), 1):
+        sheet = workbook.create_sheet(f"Data {number}")
+        sheet.append(list(df.columns))
+        part = df.iloc[start:start + EXCEL_MAX_DATA_ROWS].astype(object)
+        part = part.where(part.notna(), None)
+        for row in part.itertuples(index=False, name=None):
+            sheet.append(list(row))
+    tmp_path = f"{path}.tmp"
+    workbook.save(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def workbook_path(directory, rows, cols=5, cardinality=20, null_rate=0.0, seed=0):
+    """Path of the generated workbook for these parameters, writing it if missing.
+
+    Workbooks are reused between runs, so comparing commits does not pay
+    for generation again.
+    """
+    name = f"supermarket_{rows}r_{cols}c_{cardinality}k_{null_rate:g}n_{seed}s.xlsx"
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        write_workbook(generate_frame(rows, cols, cardinality, null_rate, seed), path)
+    return path
@@ -0,0 +1,5 @@
+"""Data engine behind the Streamlit dashboard in ``supermarket.py``.
+
+Everything in this package is free of Streamlit calls so it can be shared
+by every browser session in the process.
+"""
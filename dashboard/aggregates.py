@@ -0,0 +1,237 @@
+"""KPIs and chart aggregates, computed once per dataset and column selection.
+
+The work itself is done by the configured query backend. Results are
+memoized in a process-wide LRU keyed by ``(dataset.key, name, params)``, so
+widgets that do not change the selection (row limit, language, tab
+switches) re-render from memory. Behind it, results are pickled to disk,
+where they outlive restarts and where the batch job precomputes them.
+Row-sized results (sort orders, indexes, filter masks) have an LRU of
+their own, so a few large ones cannot push every small aggregate out.
+Returned frames are shared between sessions and must not be modified.
+"""
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import settings
+from .backends import count_order, get_backend
+from .cache import LRUCache
+from .disk_cache import ResultCache
+from .profiling import stage
+from .streaming import PairwiseMoments
+
+AGGREGATE_CACHE = LRUCache(
+    settings.AGGREGATE_CACHE_BYTES, settings.AGGREGATE_CACHE_MAX_ENTRIES
+)
+INDEX_CACHE = LRUCache(settings.INDEX_CACHE_BYTES)
+AGGREGATE_STORE = ResultCache(
+    os.path.join(settings.DISK_CACHE_DIR, "aggregates"), settings.AGGREGATE_STORE_BYTES
+)
+
+# Bump when the shape or the computation of any stored result changes
+STORE_VERSION = 4
+
+_MISSING = object()
+
+
+def memoize(dataset, name, params, compute, persist=True):
+    """Return the cached result of ``compute()`` for this dataset and params.
+
+    Pass ``persist=False`` for row-sized results such as masks and indexes,
+    which are cheaper to recompute than to keep on disk; they are kept in
+    ``INDEX_CACHE`` rather than alongside the aggregates.
+    """
+    key = (dataset.key, name, params)
+
+    def load():
+        value = AGGREGATE_STORE.get((STORE_VERSION, key), _MISSING) if persist else _MISSING
+        if value is _MISSING:
+            with stage(f"aggregate:{name}"):
+                value = compute()
+            if persist:
+                AGGREGATE_STORE.put((STORE_VERSION, key), value)
+        return value
+    cache = AGGREGATE_CACHE if persist else INDEX_CACHE
+    return cache.get_or_compute(key, load)
+
+
+def duplicate_rows(dataset):
+    return memoize(
+        dataset, "duplicates", (), lambda: get_backend().duplicate_count(dataset.df)
+    )
+
+
+def memory_usage_mb(dataset):
+    return dataset.nbytes / 1024 / 1024
+
+
+def dtype_counts(dataset):
+    def compute():
+        counts = dataset.df.dtypes.astype(str).value_counts().reset_index()
+        counts.columns = ['Data Type', 'Count']
+        return counts
+    return memoize(dataset, "dtype_counts", (), compute)
+
+
+def time_series(dataset, date_col, value_cols, freq=None):
+    """Sum of ``value_cols`` per ``freq`` period of ``date_col``.
+
+    ``freq`` is a pandas offset alias; None groups by the raw timestamps.
+    """
+    value_cols = tuple(value_cols)
+    return memoize(
+        dataset, "time_series", (date_col, value_cols, freq),
+        lambda: get_backend().group_sum(dataset.df, date_col, value_cols, freq)
+    )
+
+
+def category_counts(dataset, category_col):
+    """Rows per value of ``category_col``, most frequent first."""
+    return memoize(
+        dataset, "category_counts", (category_col,),
+        lambda: get_backend().value_counts(dataset.df, category_col)
+    )
+
+
+def top_categories(dataset, category_col, n=10):
+    """The ``n`` most frequent values of ``category_col`` with their counts."""
+    return memoize(
+        dataset, "top_categories", (category_col, n),
+        lambda: category_counts(dataset, category_col).head(n)
+    )
+
+
+def category_stats(dataset, category_col, value_col):
+    """Sum and count of ``value_col`` per category, the mergeable part of a mean."""
+    return memoize(
+        dataset, "category_stats", (category_col, value_col),
+        lambda: get_backend().group_stats(dataset.df, category_col, value_col)
+    )
+
+
+def category_means(dataset, category_col, value_col, n=10):
+    """The ``n`` categories with the highest mean of ``value_col``."""
+    def compute():
+        stats = category_stats(dataset, category_col, value_col)
+        label = f'Avg {value_col}'
+        means = pd.DataFrame({
+            category_col: stats[category_col],
+            label: stats['Sum'] / stats['Count'].where(stats['Count'] > 0),
+        })
+        return means.sort_values(label, ascending=False).head(n).reset_index(drop=True)
+    return memoize(dataset, "category_means", (category_col, value_col, n), compute)
+
+
+def pairwise_moments(dataset):
+    """Correlation sums over every numeric column, from one pass over the rows."""
+    return memoize(
+        dataset, "pairwise_moments", (),
+        lambda: PairwiseMoments.from_frame(dataset.df, dataset.schema.numeric_cols)
+    )
+
+
+def rank_moments(dataset):
+    """``pairwise_moments`` of the column ranks over an evenly spaced row sample."""
+    def compute():
+        df = dataset.df[dataset.schema.numeric_cols]
+        size = settings.CORRELATION_SAMPLE_ROWS
+        if len(df) > size:
+            df = df.iloc[np.linspace(0, len(df) - 1, size).astype(np.int64)]
+        return PairwiseMoments.from_frame(df.rank(), dataset.schema.numeric_cols)
+    return memoize(dataset, "rank_moments", (), compute)
+
+
+def correlation(dataset, value_cols, method="pearson"):
+    """Correlation matrix of ``value_cols``, "pearson" or "spearman".
+
+    Read off moments cached for all numeric columns, so adding or removing
+    a column does not rescan the rows.
+    """
+    value_cols = tuple(value_cols)
+
+    def compute():
+        moments = rank_moments(dataset) if method == "spearman" else pairwise_moments(dataset)
+        if not set(value_cols) <= set(moments.columns):
+            frame = dataset.df[list(value_cols)]
+            moments = PairwiseMoments.from_frame(
+                frame.rank() if method == "spearman" else frame, value_cols
+            )
+        return moments.correlation(value_cols)
+    return memoize(dataset, "correlation", (value_cols, method), compute)
+
+
+def seed(dataset, name, params, value, persist=True):
+    """Store a result for ``dataset`` that was derived rather than computed."""
+    key = (dataset.key, name, params)
+    if persist:
+        AGGREGATE_CACHE.put(key, value)
+        AGGREGATE_STORE.put((STORE_VERSION, key), value)
+    else:
+        INDEX_CACHE.put(key, value)
+
+
+def _merge_group_sums(current, part, params):
+    date_col, value_cols, freq = params
+    sums = pd.concat([current, part], ignore_index=True).groupby(date_col)[list(value_cols)].sum()
+    if freq is not None and not sums.empty:
+        # Periods between the old and the new rows count as zero, as in a full recompute
+        sums = sums.reindex(pd.date_range(sums.index[0], sums.index[-1], freq=freq), fill_value=0)
+    return sums.rename_axis(date_col).reset_index()
+
+
+def _merge_counts(current, part, params):
+    col = params[0]
+    counts = pd.concat([current, part], ignore_index=True).groupby(
+        col, observed=True, sort=False
+    )['Count'].sum()
+    order = count_order(counts.index, counts.to_numpy())
+    return counts.iloc[order].rename_axis(col).reset_index()
+
+
+def _merge_stats(current, part, params):
+    col = params[0]
+    return pd.concat([current, part], ignore_index=True).groupby(
+        col, observed=True, sort=False
+    )[['Sum', 'Count']].sum().reset_index()
+
+
+# name -> (part computed from the new rows alone, merge of old result and that part)
+MERGEABLE = {
+    "time_series": (
+        lambda df, params: get_backend().group_sum(df, *params), _merge_group_sums
+    ),
+    "category_counts": (
+        lambda df, params: get_backend().value_counts(df, params[0]), _merge_counts
+    ),
+    "category_stats": (
+        lambda df, params: get_backend().group_stats(df, *params), _merge_stats
+    ),
+    "pairwise_moments": (
+        lambda df, params: df, lambda current, rows, params: copy.deepcopy(current).update(rows)
+    ),
+}
+
+
+def merge_aggregates(base, rows, merged):
+    """Seed ``merged`` (``base`` plus the frame ``rows``) from ``base``'s results.
+
+    Every mergeable result cached for ``base`` is combined with the same
+    aggregate over ``rows`` only, so the history is not scanned again.
+    Derived results (top categories, means, decimated series) follow from
+    these on first use. Returns the number of results carried over.
+    """
+    carried = 0
+    for key in AGGREGATE_CACHE.keys():
+        dataset_key, name, params = key
+        if dataset_key != base.key or name not in MERGEABLE:
+            continue
+        current = AGGREGATE_CACHE.get(key)
+        if current is None:
+            continue
+        part, merge = MERGEABLE[name]
+        with stage(f"merge:{name}"):
+            seed(merged, name, params, merge(current, part(rows, params), params))
+        carried += 1
+    return carried
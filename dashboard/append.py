@@ -0,0 +1,166 @@
+"""Appending a delta workbook to a loaded dataset without reprocessing it.
+
+Only the delta file is parsed. Its columns are checked against the
+dataset's and converted to the same types, and rows whose key already
+occurs are dropped. KPI, time-series and category aggregates computed for
+the dataset are merged with the same aggregates over the new rows instead
+of being rebuilt over the full history. So are the hashes of the key
+columns, so deduplicating the next delta does not rehash the history.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+from . import aggregates
+from .dataset import Dataset
+from .ingest import SOURCE_COLUMN, concat_frames, load_dataset
+from .profiling import stage
+from .registry import REGISTRY
+from .schema import Schema, too_lossy
+from .streaming import RunningSummary
+
+
+class SchemaMismatch(ValueError):
+    """The delta's columns cannot be appended to the dataset."""
+
+
+def _kind(dtype):
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "date"
+    if pd.api.types.is_numeric_dtype(dtype):
+        return "numeric"
+    return "text"
+
+
+def _converted(series, like):
+    """``series`` in the type of ``like``, or None if too many values do not fit."""
+    kind = _kind(like.dtype)
+    if kind == "text":
+        text = series if _kind(series.dtype) == "text" else series.map(str, na_action='ignore')
+        return text.astype('category' if isinstance(like.dtype, pd.CategoricalDtype) else like.dtype)
+    if kind == _kind(series.dtype):
+        return series
+    if kind == "date":
+        converted = pd.to_datetime(series, errors='coerce', format='mixed')
+    else:
+        converted = pd.to_numeric(series, errors='coerce')
+
+    # Same tolerance as date detection on upload
+    return None if too_lossy(series, converted) else converted
+
+
+def align_rows(base_df, delta_df, source=None):
+    """``delta_df`` with ``base_df``'s columns, in its order and types.
+
+    Raises ``SchemaMismatch`` listing every missing, unexpected or
+    incompatible column. A base ``Source`` column missing from the delta is
+    filled with ``source``.
+    """
+    delta_df = delta_df.copy(deep=False)
+    if SOURCE_COLUMN in base_df.columns and SOURCE_COLUMN not in delta_df.columns:
+        delta_df[SOURCE_COLUMN] = source
+
+    problems = []
+    missing = [col for col in base_df.columns if col not in delta_df.columns]
+    extra = [col for col in delta_df.columns if col not in base_df.columns]
+    if missing:
+        problems.append("missing columns: " + ", ".join(map(str, missing)))
+    if extra:
+        problems.append("unexpected columns: " + ", ".join(map(str, extra)))
+
+    aligned = {}
+    for col in base_df.columns:
+        if col not in delta_df.columns:
+            continue
+        converted = _converted(delta_df[col], base_df[col])
+        if converted is None:
+            problems.append(f"{col} is not {_kind(base_df[col].dtype)}")
+        else:
+            aligned[col] = converted.reset_index(drop=True)
+    if problems:
+        raise SchemaMismatch("; ".join(problems))
+    return pd.DataFrame(aligned, columns=base_df.columns)
+
+
+def _canonical(series):
+    """``series`` in a form whose hashes do not depend on its dtype.
+
+    Concatenation can widen a key column (int to float, seconds to
+    nanoseconds), and hashes carried over from before must still match.
+    """
+    dtype = series.dtype
+    if pd.api.types.is_float_dtype(dtype):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        bits = values.view(np.uint64).copy()
+        # Whole numbers hash as the integers they equal
+        whole = np.isfinite(values) & (np.round(values) == values) & (np.abs(values) <= 2 ** 53)
+        bits[whole] = values[whole].astype(np.int64).view(np.uint64)
+        bits[np.isnan(values)] = np.iinfo(np.uint64).max
+        return pd.Series(bits)
+    if pd.api.types.is_datetime64_any_dtype(dtype) and getattr(dtype, "tz", None) is None:
+        return series.astype('datetime64[us]')
+    return series
+
+
+def _key_hashes(df, key_cols):
+    keys = pd.DataFrame({col: _canonical(df[col]).reset_index(drop=True) for col in key_cols})
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def key_hashes(dataset, key_cols):
+    """Sorted hashes of the ``key_cols`` of every row of ``dataset``."""
+    return aggregates.memoize(
+        dataset, "key_hashes", (tuple(key_cols),),
+        lambda: np.sort(_key_hashes(dataset.df, key_cols)), persist=False
+    )
+
+
+def _new_rows(known, rows, key_cols):
+    """The rows whose key is neither among the sorted hashes ``known`` nor earlier in ``rows``.
+
+    Returns them with the sorted hashes of their keys.
+    """
+    hashes = _key_hashes(rows, key_cols)
+    found = np.searchsorted(known, hashes)
+    seen = known[np.minimum(found, len(known) - 1)] == hashes if len(known) else np.zeros(len(rows), bool)
+    keep = ~seen & ~pd.Index(hashes).duplicated()
+    return rows[keep].reset_index(drop=True), np.sort(hashes[keep])
+
+
+def append_rows(base, data, file_name, key_cols=None):
+    """Append the rows of workbook ``data`` to the dataset ``base``.
+
+    ``key_cols`` identify a row for deduplication; by default the whole row
+    does. Returns ``(dataset, added, skipped)``, where ``dataset`` is
+    ``base`` itself when nothing new was added.
+    """
+    key_cols = list(key_cols or [col for col in base.df.columns if col != SOURCE_COLUMN])
+    delta = load_dataset(data, file_name)
+    with stage("append_align"):
+        rows = align_rows(base.df, delta.df, file_name)
+    with stage("append_dedupe"):
+        known = key_hashes(base, key_cols)
+        rows, hashes = _new_rows(known, rows, key_cols)
+    skipped = len(delta.df) - len(rows)
+    if rows.empty:
+        return base, 0, skipped
+
+    key = (base.key, 'append', delta.key, tuple(key_cols))
+    dataset = REGISTRY.get(key)
+    if dataset is None:
+        with stage("append_concat"):
+            df = concat_frames([base.df, rows])
+        summary = copy.deepcopy(base.summary).merge(RunningSummary.from_frame(rows))
+        dataset = REGISTRY.add(Dataset(key, df, Schema.from_frame(df), summary))
+
+        # New rows have keys unseen before, so none of them repeats a whole row
+        duplicates = aggregates.AGGREGATE_CACHE.get((base.key, "duplicates", ()))
+        if duplicates is not None:
+            aggregates.seed(dataset, "duplicates", (), duplicates)
+        aggregates.merge_aggregates(base, rows, dataset)
+        aggregates.seed(
+            dataset, "key_hashes", (tuple(key_cols),),
+            np.insert(known, np.searchsorted(known, hashes), hashes), persist=False
+        )
+    return dataset, len(rows), skipped
@@ -0,0 +1,177 @@
+"""Precompute dashboards for a directory of workbooks, outside Streamlit.
+
+    python -m dashboard.batch /data/nightly --all-sheets --workers 4
+
+Each workbook is parsed and typed once into the columnar disk cache, and the
+KPIs, chart aggregates and figures the dashboard shows by default (in the
+default language) are stored with it. Opening the same file in the app,
+with the same DASHBOARD_CACHE_DIR, then memory-maps the parsed frame and
+reads the stored results instead of parsing and computing. Workbooks are
+processed in parallel worker processes.
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import aggregates, categories, charts, settings
+from .distributions import distribution
+from .ingest import list_sheets, load_dataset, load_datasets
+from .languages import DEFAULT_LANGUAGE, LANGUAGES
+from .registry import REGISTRY
+from .timeseries import decimated_series, resolve_frequency
+
+EXTENSIONS = ('.xlsx', '.xls')
+
+
+def precompute(dataset):
+    """Compute what the dashboard shows for ``dataset`` before any selection.
+
+    Mirrors the app's default widgets: the first two numeric columns, the
+    "Auto" time-series frequency, and every date, numeric and categorical
+    column for the charts that pick one of them.
+    """
+    schema = dataset.schema
+    selected = schema.numeric_cols[:2]
+
+    dataset.summary  # KPI row
+    aggregates.duplicate_rows(dataset)
+    aggregates.dtype_counts(dataset)
+    if selected:
+        for date_col in schema.date_cols:
+            freq = resolve_frequency(dataset, date_col, "Auto")
+            decimated_series(dataset, date_col, selected, freq)
+    for col in selected:
+        distribution(dataset, col)
+    if len(selected) > 1:
+        aggregates.correlation(dataset, selected)
+    for col in schema.categorical_cols:
+        categories.cardinality(dataset, col)
+        categories.top_categories(dataset, col)
+        if selected:
+            categories.category_means(dataset, col, selected[0])
+    default_figures(dataset, selected)
+
+
+def default_figures(dataset, selected):
+    """Build the figure each chart tab opens with, titled as the app titles it."""
+    schema = dataset.schema
+    lang = LANGUAGES[DEFAULT_LANGUAGE]
+
+    if not aggregates.dtype_counts(dataset).empty:
+        charts.dtype_pie(dataset, lang['data_types'])
+    if schema.date_cols and selected:
+        date_col = schema.date_cols[0]
+        freq = resolve_frequency(dataset, date_col, "Auto")
+        charts.time_series_figure(dataset, date_col, selected, freq, title=f"{lang['trend']} Analysis")
+    if selected:
+        col = selected[0]
+        charts.histogram(dataset, col, title=f"Histogram of {col}", color='#636EFA')
+        charts.box(dataset, col, title=f"Box Plot of {col}", color='#00CC96')
+    if len(selected) > 1:
+        charts.correlation_heatmap(dataset, selected, lang['correlation'], method="pearson")
+    if schema.categorical_cols:
+        col = schema.categorical_cols[0]
+        charts.top_categories_bar(dataset, col, title=f"Top 10 {col}")
+        if not selected:
+            charts.top_categories_pie(dataset, col, title=f"Top 10 {col}")
+        elif categories.has_frequent_values(dataset, col):
+            value_col = selected[0]
+            charts.category_means_bar(dataset, col, value_col, title=f"Average {value_col} by {col}")
+
+
+def process_workbook(path, all_sheets=False):
+    """Load, cache and precompute one workbook; returns a summary dict."""
+    started = time.perf_counter()
+    file_name = os.path.basename(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    # Sheets one by one in this process, so workers do not start pools of their own
+    sheets = list_sheets(data, file_name) if all_sheets else [0]
+    for sheet in sheets:
+        load_dataset(data, file_name, sheet)
+    dataset = load_datasets([(file_name, data)], all_sheets=all_sheets)
+    precompute(dataset)
+    summary = {
+        'file': path,
+        'sheets': len(sheets),
+        'rows': len(dataset.df),
+        'columns': len(dataset.df.columns),
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+    REGISTRY.clear()
+    return summary
+
+
+def find_workbooks(paths, recursive=False):
+    """Excel files named in ``paths``, looking inside directories."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            pattern = os.path.join(path, '**', '*') if recursive else os.path.join(path, '*')
+            found.extend(
+                p for p in sorted(glob.glob(pattern, recursive=recursive))
+                if p.lower().endswith(EXTENSIONS) and not os.path.basename(p).startswith('~$')
+            )
+        else:
+            found.append(path)
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m dashboard.batch',
+        description="Parse workbooks and precompute their dashboards into the cache."
+    )
+    parser.add_argument('paths', nargs='+', help="workbooks or directories of workbooks")
+    parser.add_argument('--recursive', action='store_true', help="look in subdirectories too")
+    parser.add_argument('--all-sheets', action='store_true',
+                        help="combine every sheet, as the app's all-sheets option does")
+    parser.add_argument('--workers', type=int, default=settings.INGEST_PROCESSES,
+                        help=f"parallel worker processes (default: {settings.INGEST_PROCESSES})")
+    args = parser.parse_args(argv)
+
+    workbooks = find_workbooks(args.paths, args.recursive)
+    if not workbooks:
+        print("No workbooks found", file=sys.stderr)
+        return 1
+    print(f"Caching into {settings.DISK_CACHE_DIR}", file=sys.stderr)
+
+    failed = 0
+
+    def report(path, outcome=None, error=None):
+        if error is not None:
+            print(f"FAILED {path}: {error}", file=sys.stderr)
+        else:
+            print(f"{path}: {outcome['rows']:,} rows x {outcome['columns']} columns "
+                  f"from {outcome['sheets']} sheet(s) in {outcome['seconds']:.2f}s")
+
+    if args.workers <= 1 or len(workbooks) == 1:
+        for path in workbooks:
+            try:
+                report(path, process_workbook(path, args.all_sheets))
+            except Exception as exc:
+                failed += 1
+                report(path, error=exc)
+    else:
+        # Spawned, like the ingest pool: no forked copies of loaded state
+        with ProcessPoolExecutor(
+            max_workers=min(args.workers, len(workbooks)),
+            mp_context=multiprocessing.get_context('spawn')
+        ) as pool:
+            futures = {pool.submit(process_workbook, path, args.all_sheets): path for path in workbooks}
+            for future in as_completed(futures):
+                try:
+                    report(futures[future], future.result())
+                except Exception as exc:
+                    failed += 1
+                    report(futures[future], error=exc)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Content hashing and a process-wide, memory-bounded LRU cache."""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+_HASH_CHUNK = 8 * 1024 * 1024
+
+
+def content_hash(data):
+    """Return a hex digest identifying ``data`` (bytes or a binary file object)."""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        digest.update(data)
+    else:
+        data.seek(0)
+        for chunk in iter(lambda: data.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+        data.seek(0)
+    return digest.hexdigest()
+
+
+def estimate_nbytes(value):
+    """Approximate in-memory size of a cached value in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True, index=True))
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_nbytes(item) for item in value)
+    # NumPy arrays and objects such as Dataset report their own size
+    nbytes = getattr(value, 'nbytes', 0)
+    return nbytes if isinstance(nbytes, int) else 0
+
+
+class LRUCache:
+    """Thread-safe LRU cache evicting by total size as well as entry count.
+
+    Streamlit runs each browser session in its own thread, so one instance
+    held at module level is shared by every session of the process.
+    """
+
+    def __init__(self, max_bytes, max_entries=None, sizeof=estimate_nbytes):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._sizeof = sizeof
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Store ``value``; values larger than the whole budget are not kept."""
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            self._evict()
+        return True
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def keys(self):
+        """Snapshot of the cached keys, least recently used first."""
+        with self._lock:
+            return list(self._entries)
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._bytes -= entry[1]
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _evict(self):
+        while self._entries and (
+            self._bytes > self.max_bytes
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
@@ -0,0 +1,182 @@
+"""Plotly figures for the chart tabs, built from memoized aggregates.
+
+Titles come from the caller, already translated. The same builders serve
+the Streamlit tabs, the benchmark harness and batch precomputation.
+
+Each figure is built once per dataset, parameters and title (which carries
+the language) and kept as its JSON, so reruns and other sessions skip both
+Plotly Express and the validation of every property. Plotly Express itself
+is imported on first use, and ``warm_up`` does that ahead of the first
+request.
+"""
+import json
+import logging
+import threading
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from . import aggregates, categories, settings
+from .aggregates import memoize
+from .distributions import box_figure, distribution, histogram_figure
+from .timeseries import decimated_series
+
+logger = logging.getLogger(__name__)
+
+_warm_up_lock = threading.Lock()
+_warm_up_thread = None
+
+
+def cached_figure(dataset, kind, params, build):
+    """The figure ``build()`` returns for ``dataset``, rebuilt from cached JSON."""
+    spec = memoize(
+        dataset, "figure", (kind, params), lambda: pio.to_json(build(), validate=False)
+    )
+    # The JSON came from a valid figure; checking every property again is the slow part
+    return go.Figure(json.loads(spec), _validate=False)
+
+
+def _warm_up():
+    try:
+        import plotly.express as px
+        from plotly.subplots import make_subplots
+
+        # The first figure loads templates and property validators
+        pio.to_json(px.bar(x=[0], y=[0]))
+        make_subplots(rows=2, cols=1)
+    except Exception as exc:
+        logger.warning("Chart warm-up failed: %s", exc)
+
+
+def warm_up():
+    """Import and exercise the chart libraries in a daemon thread, once per process."""
+    global _warm_up_thread
+    with _warm_up_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=_warm_up, name='chart-warm-up', daemon=True)
+            _warm_up_thread.start()
+        return _warm_up_thread
+
+
+def dtype_pie(dataset, title):
+    def build():
+        import plotly.express as px
+
+        return px.pie(
+            aggregates.dtype_counts(dataset),
+            values='Count',
+            names='Data Type',
+            title=title,
+            color_discrete_sequence=px.colors.qualitative.Set3
+        )
+    return cached_figure(dataset, "dtype_pie", (title,), build)
+
+
+def time_series_figure(dataset, date_col, value_cols, freq, title):
+    """Resampled, LTTB-thinned lines; WebGL once the traces get large."""
+    value_cols = tuple(value_cols)
+
+    def build():
+        series = decimated_series(dataset, date_col, value_cols, freq)
+        n_points = sum(len(x) for x, _ in series.values())
+        scatter = go.Scattergl if n_points > settings.WEBGL_THRESHOLD else go.Scatter
+
+        fig = go.Figure()
+        for col, (x, y) in series.items():
+            fig.add_trace(scatter(
+                x=x,
+                y=y,
+                mode='lines+markers',
+                name=col,
+                line=dict(width=2)
+            ))
+        fig.update_layout(
+            title=title,
+            xaxis_title=date_col,
+            yaxis_title="Value",
+            hovermode='x unified',
+            height=500
+        )
+        return fig
+    return cached_figure(dataset, "time_series", (date_col, value_cols, freq, title), build)
+
+
+def histogram(dataset, col, title, color='#636EFA'):
+    return cached_figure(
+        dataset, "histogram", (col, title, color),
+        lambda: histogram_figure(distribution(dataset, col), col, title, color)
+    )
+
+
+def box(dataset, col, title, color='#00CC96'):
+    return cached_figure(
+        dataset, "box", (col, title, color),
+        lambda: box_figure(distribution(dataset, col), col, title, color)
+    )
+
+
+def correlation_heatmap(dataset, cols, title, method="pearson"):
+    cols = tuple(cols)
+
+    def build():
+        import plotly.express as px
+
+        return px.imshow(
+            aggregates.correlation(dataset, cols, method),
+            text_auto=True,
+            aspect="auto",
+            color_continuous_scale='RdBu_r',
+            title=title,
+            height=500
+        )
+    return cached_figure(dataset, "correlation_heatmap", (cols, method, title), build)
+
+
+def top_categories_bar(dataset, col, title):
+    def build():
+        import plotly.express as px
+
+        fig = px.bar(
+            categories.top_categories(dataset, col),
+            x=col,
+            y='Count',
+            title=title,
+            color='Count',
+            color_continuous_scale='Viridis'
+        )
+        fig.update_layout(height=400, xaxis_tickangle=45)
+        return fig
+    return cached_figure(dataset, "top_categories_bar", (col, title), build)
+
+
+def category_means_bar(dataset, cat_col, value_col, title):
+    def build():
+        import plotly.express as px
+
+        fig = px.bar(
+            categories.category_means(dataset, cat_col, value_col),
+            x=cat_col,
+            y=f'Avg {value_col}',
+            title=title,
+            color=f'Avg {value_col}',
+            color_continuous_scale='Plasma'
+        )
+        fig.update_layout(height=400, xaxis_tickangle=45)
+        return fig
+    return cached_figure(dataset, "category_means_bar", (cat_col, value_col, title), build)
+
+
+def top_categories_pie(dataset, col, title):
+    def build():
+        import plotly.express as px
+
+        fig = px.pie(
+            categories.top_categories(dataset, col),
+            values='Count',
+            names=col,
+            title=title,
+            hole=0.3
+        )
+        fig.update_layout(height=400)
+        return fig
+    return cached_figure(dataset, "top_categories_pie", (col, title), build)
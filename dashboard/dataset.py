@@ -0,0 +1,50 @@
+"""The unit of data the dashboard works on."""
+from dataclasses import dataclass
+from functools import cached_property
+
+import pandas as pd
+
+from .aggregates import memoize
+from .cache import estimate_nbytes
+from .schema import Schema
+from .streaming import RunningSummary
+
+
+@dataclass
+class Dataset:
+    """A typed frame plus what is known about it.
+
+    ``key`` identifies the content (hash, engine, sheet, schema version) and
+    is what every downstream cache is keyed on. Instances are shared between
+    sessions and must be treated as read-only.
+    """
+
+    key: tuple
+    df: pd.DataFrame
+    schema: Schema
+    _summary: RunningSummary = None
+
+    @classmethod
+    def from_frame(cls, df, key=None):
+        """Wrap a frame that did not come through ``load_dataset``."""
+        if key is None:
+            key = ("frame", int(pd.util.hash_pandas_object(df, index=False).sum()))
+        return cls(key, df, Schema.from_frame(df))
+
+    @property
+    def summary(self):
+        """Running statistics, gathered while streaming or on first use.
+
+        Computed ones are stored with the aggregates, so a dataset reopened
+        from the disk cache does not scan its rows again.
+        """
+        if self._summary is None:
+            self._summary = memoize(
+                self, "running_summary", (), lambda: RunningSummary.from_frame(self.df)
+            )
+        return self._summary
+
+    @cached_property
+    def nbytes(self):
+        """Deep memory usage of the frame, measured once."""
+        return estimate_nbytes(self.df)
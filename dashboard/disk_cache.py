@@ -0,0 +1,235 @@
+"""On-disk caches: parsed DataFrames in Arrow IPC format, and small results.
+
+Arrow files are written uncompressed so they can be memory-mapped on reload.
+The modification time of each file doubles as its last-access time, which
+keeps LRU cleanup working across process restarts. Cache directories must
+be private to the user running the app: a pickle planted by anyone else
+would run arbitrary code when loaded.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import stat
+import threading
+import uuid
+
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+SUFFIX = ".arrow"
+RESULT_SUFFIX = ".pkl"
+
+# directory -> whether it passed private_directory
+_USABLE = {}
+
+
+def private_directory(directory):
+    """Create ``directory`` readable only by this user, or check an existing one.
+
+    Raises ``PermissionError`` if the directory belongs to someone else, or
+    if a parent directory lets other users replace it.
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if not hasattr(os, "getuid"):  # Windows: per-user temp directories
+        return
+    path = os.path.abspath(directory)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(f"{path} is not a directory owned by this user")
+    if info.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    # Ancestors writable by others must be sticky, like /tmp, so entries
+    # in them cannot be renamed or replaced by other users
+    parent = os.path.dirname(path)
+    while parent != path:
+        info = os.stat(parent)
+        if info.st_uid not in (0, os.getuid()) or (
+            info.st_mode & 0o022 and not info.st_mode & stat.S_ISVTX
+        ):
+            raise PermissionError(f"{parent} can be modified by other users")
+        path, parent = parent, os.path.dirname(parent)
+
+
+def _file_name(key, suffix):
+    return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).hexdigest() + suffix
+
+
+class ColumnarCache:
+    """Directory of Arrow IPC files capped at ``max_bytes`` with LRU cleanup."""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path_for(self, key):
+        return os.path.join(self.directory, _file_name(key, SUFFIX))
+
+    def get(self, key):
+        """Memory-map the cached frame for ``key``, or return None."""
+        path = self.path_for(key)
+        if not _usable(self.directory) or not os.path.exists(path):
+            return None
+        try:
+            with pa.memory_map(path, "r") as source:
+                table = pa.ipc.open_file(source).read_all()
+            df = table.to_pandas(split_blocks=True)
+        except (OSError, pa.ArrowException) as exc:
+            logger.warning("Dropping unreadable cache file %s: %s", path, exc)
+            remove_quietly(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return df
+
+    def put(self, key, df):
+        """Write ``df`` for ``key``; frames Arrow cannot represent are skipped."""
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowException, TypeError, ValueError) as exc:
+            logger.info("Not caching frame on disk: %s", exc)
+            return False
+        if table.nbytes > self.max_bytes or not _usable(self.directory):
+            return False
+
+        path = self.path_for(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with pa.OSFile(tmp_path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("Could not write cache file %s: %s", path, exc)
+            remove_quietly(tmp_path)
+            return False
+        self.cleanup()
+        return True
+
+    def cleanup(self):
+        """Delete least recently used files until the directory fits the budget."""
+        with self._lock:
+            prune_directory(self.directory, self.max_bytes, SUFFIX)
+
+    def nbytes(self):
+        return directory_size(self.directory, SUFFIX)
+
+
+class ResultCache:
+    """Directory of pickled results capped at ``max_bytes`` with LRU cleanup.
+
+    Holds aggregates this application computed itself, so they survive
+    restarts and can be precomputed by the batch job. Pruning runs after
+    every ``max_bytes / 16`` written rather than on each small write.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._written = max_bytes
+
+    def path_for(self, key):
+        return os.path.join(self.directory, _file_name(key, RESULT_SUFFIX))
+
+    def get(self, key, default=None):
+        if not _usable(self.directory):
+            return default
+        path = self.path_for(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except Exception as exc:  # truncated file or classes that changed since
+            logger.warning("Dropping unreadable result file %s: %s", path, exc)
+            remove_quietly(path)
+            return default
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        try:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as exc:
+            logger.info("Not caching result on disk: %s", exc)
+            return False
+        if len(payload) > self.max_bytes // 16 or not _usable(self.directory):
+            return False
+
+        path = self.path_for(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("Could not write result file %s: %s", path, exc)
+            remove_quietly(tmp_path)
+            return False
+        with self._lock:
+            self._written += len(payload)
+            if self._written >= self.max_bytes // 16:
+                self._written = 0
+                prune_directory(self.directory, self.max_bytes, RESULT_SUFFIX)
+        return True
+
+    def nbytes(self):
+        return directory_size(self.directory, RESULT_SUFFIX)
+
+
+def _usable(directory):
+    """Whether ``directory`` is private, checked once per process."""
+    usable = _USABLE.get(directory)
+    if usable is None:
+        try:
+            private_directory(directory)
+            usable = True
+        except OSError as exc:
+            logger.warning("Disk cache in %s disabled: %s", directory, exc)
+            usable = False
+        _USABLE[directory] = usable
+    return usable
+
+
+def remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _cache_files(directory, suffix):
+    try:
+        with os.scandir(directory) as it:
+            return [
+                (e.stat().st_mtime, e.stat().st_size, e.path)
+                for e in it if e.is_file() and e.name.endswith(suffix)
+            ]
+    except FileNotFoundError:
+        return []
+
+
+def directory_size(directory, suffix):
+    return sum(size for _, size, _ in _cache_files(directory, suffix))
+
+
+def prune_directory(directory, max_bytes, suffix):
+    """Delete the oldest ``suffix`` files in ``directory`` until they fit ``max_bytes``.
+
+    ``suffix`` may be a tuple of suffixes.
+    """
+    entries = _cache_files(directory, suffix)
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        remove_quietly(path)
+        total -= size
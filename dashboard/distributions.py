@@ -0,0 +1,121 @@
+"""Histogram and box plot statistics computed on the server.
+
+Plotly Express ships every row of the column to the browser and bins it
+there. These helpers reduce a column to bin counts, box statistics and a
+capped outlier sample with NumPy, so the figure payload depends on the bin
+count rather than the row count.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import plotly.graph_objects as go
+
+from . import settings
+from .aggregates import memoize
+
+
+@dataclass
+class Distribution:
+    count: int
+    edges: np.ndarray
+    counts: np.ndarray
+    mean: float
+    q1: float
+    median: float
+    q3: float
+    lowerfence: float
+    upperfence: float
+    outliers: np.ndarray
+
+
+def _values(series):
+    if series.dtype == bool:
+        series = series.astype(np.int8)
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return values[np.isfinite(values)]
+
+
+def _compute(series, nbins):
+    values = _values(series)
+    if not len(values):
+        empty = np.array([])
+        return Distribution(0, empty, empty, *([np.nan] * 6), empty)
+
+    counts, edges = np.histogram(values, bins=nbins)
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    lowerfence, upperfence = inside.min(), inside.max()
+
+    outliers = values[(values < lowerfence) | (values > upperfence)]
+    cap = settings.OUTLIER_SAMPLE_SIZE
+    if len(outliers) > cap:
+        # Keep the extremes so the axis range matches the full data
+        rng = np.random.default_rng(0)
+        sample = rng.choice(outliers, cap - 2, replace=False)
+        outliers = np.concatenate([[outliers.min(), outliers.max()], sample])
+
+    return Distribution(
+        len(values), edges, counts, float(values.mean()),
+        float(q1), float(median), float(q3),
+        float(lowerfence), float(upperfence), outliers
+    )
+
+
+def distribution(dataset, col, nbins=30):
+    """Binned counts and box statistics for one numeric column, memoized."""
+    return memoize(dataset, "distribution", (col, nbins),
+                   lambda: _compute(dataset.df[col], nbins))
+
+
+def _box_trace(dist, name, color, horizontal=False):
+    position = [name]
+    stats = dict(
+        q1=[dist.q1], median=[dist.median], q3=[dist.q3],
+        lowerfence=[dist.lowerfence], upperfence=[dist.upperfence],
+        mean=[dist.mean], name=name, marker_color=color, showlegend=False,
+        boxpoints=False
+    )
+    outlier_stats = dict(
+        mode='markers', marker=dict(color=color, size=4), name=name,
+        showlegend=False, hoverinfo='x' if horizontal else 'y'
+    )
+    if horizontal:
+        box = go.Box(y=position, orientation='h', **stats)
+        points = go.Scatter(x=dist.outliers, y=position * len(dist.outliers), **outlier_stats)
+    else:
+        box = go.Box(x=position, **stats)
+        points = go.Scatter(x=position * len(dist.outliers), y=dist.outliers, **outlier_stats)
+    return box, points
+
+
+def histogram_figure(dist, name, title, color='#636EFA'):
+    """Histogram with a marginal box plot, like ``px.histogram(marginal="box")``."""
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(
+        rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.02
+    )
+    for trace in _box_trace(dist, name, color, horizontal=True):
+        fig.add_trace(trace, row=1, col=1)
+    if dist.count:
+        fig.add_trace(go.Bar(
+            x=(dist.edges[:-1] + dist.edges[1:]) / 2,
+            y=dist.counts,
+            width=np.diff(dist.edges),
+            marker_color=color,
+            name=name,
+            showlegend=False
+        ), row=2, col=1)
+    fig.update_yaxes(showticklabels=False, row=1, col=1)
+    fig.update_xaxes(title_text=name, row=2, col=1)
+    fig.update_yaxes(title_text='count', row=2, col=1)
+    fig.update_layout(title=title, bargap=0)
+    return fig
+
+
+def box_figure(dist, name, title, color='#00CC96'):
+    """Vertical box plot drawn from precomputed statistics, like ``px.box``."""
+    fig = go.Figure(_box_trace(dist, name, color))
+    fig.update_layout(title=title, yaxis_title=name)
+    return fig
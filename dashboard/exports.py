@@ -0,0 +1,147 @@
+"""CSV and Excel downloads generated on request in background threads.
+
+Nothing is written until a session asks for a format. The job then runs on
+a small thread pool, reporting progress as it writes the frame in chunks,
+and the finished file is kept on disk per dataset so every later session
+gets it immediately. Excel files are written with openpyxl's write-only
+mode, which streams rows to disk instead of building the workbook in memory.
+"""
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from . import settings
+from .disk_cache import private_directory, prune_directory, remove_quietly
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = os.path.join(settings.DISK_CACHE_DIR, "exports")
+FORMATS = {
+    "csv": ("text/csv", "processed_data.csv"),
+    "xlsx": (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "processed_data.xlsx",
+    ),
+}
+EXCEL_MAX_ROWS = 1048576
+
+_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.EXPORT_WORKERS, thread_name_prefix="export"
+)
+_JOBS = {}
+_LOCK = threading.Lock()
+
+
+class ExportJob:
+    """One export running in the background; ``progress`` goes from 0 to 1."""
+
+    def __init__(self, path):
+        self.path = path
+        self.progress = 0.0
+        self.error = None
+        self.future = None
+
+    @property
+    def done(self):
+        return self.future is not None and self.future.done()
+
+
+def _chunks(df):
+    step = settings.EXPORT_CHUNK_ROWS
+    for start in range(0, len(df), step):
+        yield start + step, df.iloc[start:start + step]
+
+
+def write_csv(df, path, progress):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if df.empty:
+            df.to_csv(f, index=False)
+        for end, chunk in _chunks(df):
+            chunk.to_csv(f, index=False, header=f.tell() == 0)
+            progress(min(end / len(df), 1.0))
+
+
+def _excel_value(value):
+    if value is None or value is pd.NaT or (isinstance(value, float) and value != value):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.tz_localize(None).to_pydatetime() if value.tzinfo else value.to_pydatetime()
+    return value
+
+
+def write_xlsx(df, path, progress):
+    from openpyxl import Workbook
+
+    if len(df) + 1 > EXCEL_MAX_ROWS:
+        raise ValueError(f"Excel sheets hold at most {EXCEL_MAX_ROWS:,} rows")
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Data")
+    sheet.append([str(col) for col in df.columns])
+    for end, chunk in _chunks(df):
+        for row in chunk.astype(object).itertuples(index=False, name=None):
+            sheet.append([_excel_value(v) for v in row])
+        progress(min(end / len(df), 1.0))
+    workbook.save(path)
+
+
+_WRITERS = {"csv": write_csv, "xlsx": write_xlsx}
+
+
+def _path_for(dataset, fmt):
+    name = hashlib.blake2b(repr(dataset.key).encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(EXPORT_DIR, f"{name}.{fmt}")
+
+
+def _run(job, df, fmt):
+    tmp_path = f"{job.path}.{uuid.uuid4().hex}.tmp"
+    try:
+        private_directory(EXPORT_DIR)
+        _WRITERS[fmt](df, tmp_path, lambda fraction: setattr(job, "progress", fraction))
+        os.replace(tmp_path, job.path)
+        prune_directory(EXPORT_DIR, settings.EXPORT_CACHE_BYTES, tuple(f".{f}" for f in FORMATS))
+    except Exception as exc:
+        logger.warning("Export to %s failed: %s", fmt, exc)
+        job.error = exc
+        remove_quietly(tmp_path)
+    job.progress = 1.0
+
+
+def finished_export(dataset, fmt):
+    """Path of the finished export for ``dataset``, or None."""
+    path = _path_for(dataset, fmt)
+    if os.path.exists(path):
+        return path
+    return None
+
+
+def export_job(dataset, fmt):
+    """The running or failed job for ``dataset`` and ``fmt``, or None."""
+    with _LOCK:
+        return _JOBS.get((dataset.key, fmt))
+
+
+def request_export(dataset, fmt):
+    """Start generating ``fmt`` for ``dataset`` unless it is done or underway."""
+    key = (dataset.key, fmt)
+    with _LOCK:
+        job = _JOBS.get(key)
+        if job is not None and job.error is None:
+            return job
+        job = ExportJob(_path_for(dataset, fmt))
+        _JOBS[key] = job
+        job.future = _EXECUTOR.submit(_run, job, dataset.df, fmt)
+        job.future.add_done_callback(lambda _: _forget(key, job))
+    return job
+
+
+def _forget(key, job):
+    # Failed jobs stay visible so the session can show the error
+    if job.error is None:
+        with _LOCK:
+            if _JOBS.get(key) is job:
+                del _JOBS[key]
@@ -0,0 +1,139 @@
+"""Row filters evaluated against precomputed per-column structures.
+
+Range filters on numeric and date columns binary-search a sorted index of
+the column; category filters look codes up in a per-value bitmap. Every
+single-filter mask is memoized, so changing one filter recomputes only its
+own mask before the cached masks are ANDed together.
+
+A filter is ``("range", low, high)`` (inclusive) or ``("in", values)``;
+a filter set maps column names to filters.
+"""
+import numpy as np
+import pandas as pd
+
+from . import settings
+from .aggregates import memoize
+from .dataset import Dataset
+from .registry import REGISTRY
+
+
+def _sort_keys(series):
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        # NaT is the smallest int64, so it sorts first and never falls in a range
+        return series.to_numpy(dtype='datetime64[ns]').view(np.int64)
+    if pd.api.types.is_bool_dtype(series.dtype):
+        series = series.astype(np.int8)
+    # NaN sorts last and never falls in a finite range
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _bound(series, value):
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return pd.Timestamp(value).as_unit('ns').value
+    return float(value)
+
+
+def sorted_index(dataset, col):
+    """``(sorted_values, order)`` with ``sorted_values == keys[order]``."""
+    def compute():
+        keys = _sort_keys(dataset.df[col])
+        order = np.argsort(keys, kind='stable')
+        if len(order) < np.iinfo(np.int32).max:
+            order = order.astype(np.int32)
+        return keys[order], order
+    return memoize(dataset, "sorted_index", (col,), compute, persist=False)
+
+
+def category_codes(dataset, col):
+    """``(codes, values)``: integer code per row (-1 for missing) and the distinct values."""
+    def compute():
+        series = dataset.df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series.cat.codes.to_numpy(), series.cat.categories
+        codes, uniques = pd.factorize(series)
+        return codes, pd.Index(uniques)
+    return memoize(dataset, "category_codes", (col,), compute, persist=False)
+
+
+def value_bounds(dataset, col):
+    """Smallest and largest non-missing value of a range-filterable column."""
+    def compute():
+        series = dataset.df[col]
+        return series.min(), series.max()
+    return memoize(dataset, "value_bounds", (col,), compute)
+
+
+def filter_options(dataset, col, limit=None):
+    """The most frequent values of ``col``, offered by category filters."""
+    limit = limit or settings.FILTER_MAX_OPTIONS
+
+    def compute():
+        codes, values = category_codes(dataset, col)
+        counts = np.bincount(codes[codes >= 0], minlength=len(values))
+        top = np.argsort(-counts, kind='stable')[:limit]
+        return [values[i] for i in top if counts[i] > 0]
+    return memoize(dataset, "filter_options", (col, limit), compute)
+
+
+def _range_mask(dataset, col, low, high):
+    series = dataset.df[col]
+    sorted_values, order = sorted_index(dataset, col)
+    start = np.searchsorted(sorted_values, _bound(series, low), side='left')
+    end = np.searchsorted(sorted_values, _bound(series, high), side='right')
+    mask = np.zeros(len(order), dtype=bool)
+    mask[order[start:end]] = True
+    return mask
+
+
+def _isin_mask(dataset, col, values):
+    codes, uniques = category_codes(dataset, col)
+    # One slot per distinct value plus a trailing False slot that code -1 lands on
+    allowed = np.zeros(len(uniques) + 1, dtype=bool)
+    positions = uniques.get_indexer(list(values))
+    allowed[positions[positions >= 0]] = True
+    return allowed[codes]
+
+
+def filter_mask(dataset, col, spec):
+    """Boolean row mask for one filter, memoized per dataset."""
+    def compute():
+        if spec[0] == "range":
+            return _range_mask(dataset, col, spec[1], spec[2])
+        return _isin_mask(dataset, col, spec[1])
+    return memoize(dataset, "filter_mask", (col, spec), compute, persist=False)
+
+
+def filter_signature(filters):
+    return tuple(sorted(filters.items(), key=lambda item: repr(item[0])))
+
+
+def combined_mask(dataset, filters):
+    """AND of the per-filter masks, or None when no filter is set."""
+    if not filters:
+        return None
+    signature = filter_signature(filters)
+
+    def compute():
+        masks = [filter_mask(dataset, col, spec) for col, spec in signature]
+        return np.logical_and.reduce(masks) if len(masks) > 1 else masks[0]
+    return memoize(dataset, "combined_mask", signature, compute, persist=False)
+
+
+def filter_dataset(dataset, filters):
+    """The rows of ``dataset`` passing every filter, as a dataset of its own.
+
+    Without filters the dataset itself is returned. Otherwise the selected
+    rows are gathered once per filter set into a registered dataset, so
+    sessions share it, and the view gets its own key so every aggregate is
+    memoized per filter set. Sessions showing a view hold a registry handle
+    on it; views nobody holds count against the dataset budget.
+    """
+    if not filters:
+        return dataset
+    key = (dataset.key, "filtered", filter_signature(filters))
+    view = REGISTRY.get(key)
+    if view is None:
+        mask = combined_mask(dataset, filters)
+        rows = dataset.df.iloc[np.flatnonzero(mask)].reset_index(drop=True)
+        view = REGISTRY.add(Dataset(key, rows, dataset.schema))
+    return view
@@ -0,0 +1,239 @@
+"""Forecasts of the resampled time series, one series or one per category.
+
+Every series of a request is fitted at once: the per-period sums form a
+``(series, periods)`` matrix, and Holt-Winters runs its recursions over
+the periods with every series and every candidate smoothing parameter as
+array dimensions, so hundreds of category series cost a few NumPy
+operations per period rather than a Python loop per series. Fitted states
+are memoized per dataset, column and frequency; projecting them forward
+to any horizon is then immediate.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+
+from . import categories, settings
+from .aggregates import memoize, time_series
+from .timeseries import auto_frequency
+
+MODELS = {
+    "Holt-Winters": "holt_winters",
+    "Seasonal naive": "seasonal_naive",
+}
+FREQUENCIES = {
+    "Auto": "auto",
+    "Hour": "h",
+    "Day": "D",
+    "Week": "W",
+    "Month": "MS",
+}
+# Periods per season at each frequency
+SEASON_LENGTHS = {"h": 24, "D": 7, "W": 52, "MS": 12, "YS": 1}
+
+# Candidate (alpha, beta, gamma); each series keeps the one with the least one-step error
+_GRID = np.array([
+    (alpha, beta, gamma)
+    for alpha in (0.1, 0.3, 0.5, 0.7, 0.9)
+    for beta in (0.0, 0.05, 0.2)
+    for gamma in (0.05, 0.2, 0.5)
+])
+
+
+@dataclass
+class Fit:
+    model: str
+    freq: str
+    periods: pd.DatetimeIndex
+    labels: list
+    history: np.ndarray
+    level: np.ndarray
+    trend: np.ndarray
+    season: np.ndarray
+    params: np.ndarray
+    rmse: np.ndarray
+
+    @property
+    def nbytes(self):
+        arrays = (self.history, self.level, self.trend, self.season, self.params, self.rmse)
+        return sum(array.nbytes for array in arrays) + self.periods.nbytes
+
+
+# Coarsest spacing each frequency stands for, finest first
+_SPACINGS = [("h", pd.Timedelta(hours=12)), ("D", pd.Timedelta(days=4)),
+             ("W", pd.Timedelta(days=20)), ("MS", pd.Timedelta(days=300)), ("YS", None)]
+_ORDER = [freq for freq, _ in _SPACINGS]
+
+
+def spacing_frequency(dataset, date_col):
+    """The frequency matching the median gap between distinct dates."""
+    def compute():
+        dates = np.unique(dataset.df[date_col].dropna().to_numpy(dtype='datetime64[ns]'))
+        if len(dates) < 2:
+            return "D"
+        gap = pd.Timedelta(np.median(np.diff(dates)))
+        return next(freq for freq, limit in _SPACINGS if limit is None or gap <= limit)
+    return memoize(dataset, "spacing_frequency", (date_col,), compute)
+
+
+def resolve_frequency(dataset, date_col, label):
+    """A regular frequency for ``label``; "Auto" never resolves to raw timestamps.
+
+    "Auto" follows how often the data is recorded, coarsened further when
+    that would exceed the time series bucket limit.
+    """
+    freq = FREQUENCIES[label]
+    if freq == "auto":
+        freq = spacing_frequency(dataset, date_col)
+        limited = auto_frequency(dataset, date_col)
+        if limited is not None and _ORDER.index(limited) > _ORDER.index(freq):
+            freq = limited
+    return freq
+
+
+def _season_length(freq, n_periods):
+    m = SEASON_LENGTHS.get(freq, 1)
+    # Two full seasons are needed to initialise the seasonal terms
+    return m if n_periods >= 2 * m else 1
+
+
+def panel(dataset, date_col, value_col, freq, category_col=None):
+    """``(periods, labels, matrix)`` of per-period sums, one matrix row per series."""
+    if category_col is None:
+        frame = time_series(dataset, date_col, (value_col,), freq)
+        return pd.DatetimeIndex(frame[date_col]), [value_col], frame[value_col].to_numpy(dtype=np.float64)[None, :]
+
+    def compute():
+        top = categories.top_categories(dataset, category_col, settings.FORECAST_MAX_SERIES)
+        df = dataset.df
+        rows = df.loc[df[category_col].isin(top[category_col]), [date_col, category_col, value_col]]
+        sums = (
+            rows.groupby([pd.Grouper(key=date_col, freq=freq), category_col], observed=True)[value_col]
+            .sum()
+            .unstack(fill_value=0)
+        )
+        if sums.empty:
+            return pd.DatetimeIndex([]), [], np.empty((0, 0))
+        periods = pd.date_range(sums.index[0], sums.index[-1], freq=freq)
+        sums = sums.reindex(index=periods, columns=list(top[category_col]), fill_value=0)
+        return periods, list(sums.columns), sums.to_numpy(dtype=np.float64).T
+    return memoize(dataset, "forecast_panel", (date_col, value_col, freq, category_col), compute)
+
+
+def _holt_winters(y, m):
+    """Additive Holt-Winters fitted to every row of ``y``, parameters by grid search."""
+    k, n = y.shape
+    alpha, beta, gamma = (_GRID[:, i, None] for i in range(3))
+    if m == 1:
+        gamma = np.zeros_like(gamma)
+
+    first = y[:, :m].mean(axis=1)
+    trend0 = (y[:, m:2 * m].mean(axis=1) - first) / m if n >= 2 * m else np.zeros(k)
+    # The first season's mean sits at its middle period; the trend line
+    # through it gives the level just before period 0 and, subtracted from
+    # the first season, seasonal terms that leave the trend out
+    offsets = np.arange(m) - (m - 1) / 2
+    level0 = first - trend0 * ((m - 1) / 2 + 1)
+    season0 = y[:, :m] - (first[:, None] + trend0[:, None] * offsets)
+    # States carry a leading grid dimension: (candidates, series[, season])
+    level = np.broadcast_to(level0, (len(_GRID), k)).copy()
+    trend = np.broadcast_to(trend0, (len(_GRID), k)).copy()
+    season = np.broadcast_to(season0, (len(_GRID), k, m)).copy()
+    sse = np.zeros((len(_GRID), k))
+
+    for t in range(n):
+        phase = t % m
+        error = y[:, t] - (level + trend + season[:, :, phase])
+        if t >= m:
+            sse += error ** 2
+        level = level + trend + alpha * error
+        trend = trend + alpha * beta * error
+        season[:, :, phase] += gamma * (1 - alpha) * error
+
+    best = np.argmin(sse, axis=0)
+    series = np.arange(k)
+    # Rotate seasons so position 0 is the first forecast period
+    season = np.roll(season[best, series], -(n % m), axis=1)
+    rmse = np.sqrt(sse[best, series] / max(n - m, 1))
+    return level[best, series], trend[best, series], season, _GRID[best], rmse
+
+
+def _seasonal_naive(y, m):
+    k, n = y.shape
+    errors = y[:, m:] - y[:, :-m]
+    rmse = np.sqrt((errors ** 2).mean(axis=1)) if n > m else np.full(k, np.nan)
+    return np.zeros(k), np.zeros(k), y[:, n - m:].copy(), np.full((k, 3), np.nan), rmse
+
+
+def fit(dataset, date_col, value_col, freq, category_col=None, model="holt_winters"):
+    """Fitted states for the series of ``value_col``, per ``category_col`` value if given.
+
+    Without ``category_col`` there is one series, the column total.
+    """
+    def compute():
+        periods, labels, y = panel(dataset, date_col, value_col, freq, category_col)
+        m = _season_length(freq, y.shape[1])
+        if not y.size:
+            empty = np.empty(0)
+            return Fit(model, freq, periods, labels, y, empty, empty, np.empty((0, 1)), np.empty((0, 3)), empty)
+        fitter = _seasonal_naive if model == "seasonal_naive" else _holt_winters
+        return Fit(model, freq, periods, labels, y, *fitter(y, m))
+    return memoize(dataset, "forecast_fit", (date_col, value_col, category_col, freq, model), compute)
+
+
+def predict(result, horizon):
+    """``(future_periods, values)``: the next ``horizon`` periods of every series."""
+    steps = np.arange(1, horizon + 1)
+    m = result.season.shape[1]
+    values = (
+        result.level[:, None]
+        + result.trend[:, None] * steps
+        + result.season[:, (steps - 1) % m]
+    )
+    if not len(result.periods):
+        return pd.DatetimeIndex([]), values
+    future = pd.date_range(result.periods[-1], periods=horizon + 1, freq=result.freq)[1:]
+    return future, values
+
+
+def forecast_table(result, horizon):
+    """Forecasts as a frame: one row per series, one column per future period."""
+    future, values = predict(result, horizon)
+    labels = future.strftime('%Y-%m-%d %H:%M' if result.freq == 'h' else '%Y-%m-%d')
+    table = pd.DataFrame(values, index=result.labels, columns=labels)
+    table.insert(0, 'RMSE', result.rmse)
+    return table
+
+
+def forecast_figure(result, horizon, labels, title):
+    """History and forecast lines of the ``labels`` series, with a band for a single one."""
+    future, values = predict(result, horizon)
+    n_points = len(labels) * (len(result.periods) + horizon)
+    scatter = go.Scattergl if n_points > settings.WEBGL_THRESHOLD else go.Scatter
+    colors = qualitative.Plotly
+
+    fig = go.Figure()
+    for i, label in enumerate(labels):
+        row = result.labels.index(label)
+        color = colors[i % len(colors)]
+        fig.add_trace(scatter(
+            x=result.periods, y=result.history[row], mode='lines',
+            name=str(label), line=dict(color=color, width=2)
+        ))
+        fig.add_trace(scatter(
+            x=future, y=values[row], mode='lines',
+            name=f"{label} (forecast)", line=dict(color=color, width=2, dash='dash')
+        ))
+        if len(labels) == 1 and np.isfinite(result.rmse[row]):
+            # About 95% of one-step errors fall within the band
+            spread = 1.96 * result.rmse[row]
+            fig.add_trace(go.Scatter(
+                x=np.concatenate([future, future[::-1]]),
+                y=np.concatenate([values[row] + spread, (values[row] - spread)[::-1]]),
+                fill='toself', fillcolor='rgba(99, 110, 250, 0.15)',
+                line=dict(width=0), hoverinfo='skip', showlegend=False
+            ))
+    fig.update_layout(title=title, yaxis_title="Value", hovermode='x unified', height=500)
+    return fig
@@ -0,0 +1,275 @@
+"""Reading uploaded workbooks into typed datasets."""
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from . import aggregates, settings
+from .cache import content_hash
+from .dataset import Dataset
+from .disk_cache import ColumnarCache
+from .profiling import stage
+from .registry import REGISTRY
+from .schema import SCHEMA_VERSION, Schema, apply_schema, infer_schema
+from .streaming import RunningSummary, read_workbook_chunked
+
+# Datasets are keyed by (content hash, engine, sheet, schema version) and
+# shared across sessions through the registry; their frames are also kept
+# as Arrow files on local disk, surviving process restarts
+DISK_CACHE = ColumnarCache(settings.DISK_CACHE_DIR, settings.DISK_CACHE_BYTES)
+
+SOURCE_COLUMN = 'Source'
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def engine_for(file_name):
+    """Pick the pandas Excel engine from the file extension."""
+    return 'xlrd' if file_name.lower().endswith('.xls') else 'openpyxl'
+
+
+def _as_buffer(data):
+    return io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data
+
+
+def read_workbook(data, file_name, sheet=0):
+    """Parse one sheet of an Excel workbook with the matching pandas engine."""
+    return pd.read_excel(_as_buffer(data), sheet_name=sheet, engine=engine_for(file_name))
+
+
+def list_sheets(data, file_name):
+    """Names of the worksheets in a workbook, in file order."""
+    if engine_for(file_name) == 'openpyxl':
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(_as_buffer(data), read_only=True)
+        try:
+            return workbook.sheetnames
+        finally:
+            workbook.close()
+    with pd.ExcelFile(_as_buffer(data), engine='xlrd') as workbook:
+        return workbook.sheet_names
+
+
+def _size_of(data):
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return len(data)
+    return data.getbuffer().nbytes if hasattr(data, 'getbuffer') else 0
+
+
+def parse_sheet(data, file_name, sheet=0, progress=None):
+    """Parse and type one sheet without touching any cache.
+
+    Large .xlsx files are streamed in chunks. Returns ``(df, summary)``;
+    ``summary`` is None unless the sheet was streamed. Runs in worker
+    processes as well, so it must stay a picklable module-level function.
+    """
+    if engine_for(file_name) == 'openpyxl' and _size_of(data) >= settings.STREAM_THRESHOLD_BYTES:
+        with stage("parse_streamed"):
+            return read_workbook_chunked(data, sheet, progress=progress)
+    with stage("parse"):
+        raw = read_workbook(data, file_name, sheet)
+    with stage("type_detection"):
+        df, _ = apply_schema(raw, infer_schema(raw))
+    return df, None
+
+
+def _dataset_key(digest, file_name, sheet):
+    return (digest, engine_for(file_name), sheet, SCHEMA_VERSION)
+
+
+def _cached_dataset(key):
+    dataset = REGISTRY.get(key)
+    if dataset is None:
+        with stage("disk_cache_read"):
+            df = DISK_CACHE.get(key)
+        if df is not None:
+            dataset = REGISTRY.add(Dataset(key, df, Schema.from_frame(df)))
+    return dataset
+
+
+def _store_dataset(key, df, summary=None):
+    with stage("disk_cache_write"):
+        DISK_CACHE.put(key, df)
+    dataset = REGISTRY.add(Dataset(key, df, Schema.from_frame(df), summary))
+    if summary is not None:
+        # Kept for when the frame is next read back from the disk cache
+        aggregates.seed(dataset, "running_summary", (), summary)
+    return dataset
+
+
+def load_dataset(data, file_name, sheet=0, digest=None, progress=None):
+    """Parse and type one sheet, reusing earlier results for the same bytes.
+
+    Lookups go to the shared registry first, then to the memory-mapped Arrow
+    copy on disk, and only then to the Excel engine and type inference.
+    Large .xlsx files are streamed in chunks, reporting
+    ``progress(rows_read, total_rows)`` along the way.
+
+    ``data`` is the raw file content or a binary file object. Pass ``digest``
+    when the caller already knows the content hash to skip rehashing.
+    """
+    if digest is None:
+        with stage("hash"):
+            digest = content_hash(data)
+    key = _dataset_key(digest, file_name, sheet)
+    dataset = _cached_dataset(key)
+    if dataset is None:
+        df, summary = parse_sheet(data, file_name, sheet, progress)
+        dataset = _store_dataset(key, df, summary)
+    return dataset
+
+
+def _process_pool():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            # Spawned workers: forking a threaded server process is unsafe
+            _POOL = ProcessPoolExecutor(
+                max_workers=settings.INGEST_PROCESSES,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _POOL
+
+
+def _discard_pool(pool):
+    """Drop a broken pool so the next ``_process_pool`` call starts a fresh one."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def concat_frames(frames):
+    """Stack frames, keeping category dtypes by merging their categories."""
+    frames = [frame.copy(deep=False) for frame in frames]
+    columns = {col for frame in frames for col in frame.columns}
+    for col in columns:
+        parts = [frame[col] for frame in frames if col in frame.columns]
+        if len(parts) == len(frames) and all(
+            isinstance(part.dtype, pd.CategoricalDtype) for part in parts
+        ):
+            try:
+                categories = union_categoricals(parts, ignore_order=True).categories
+            except TypeError:  # categories of different types
+                continue
+            for frame in frames:
+                frame[col] = frame[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _concat_sources(frames, sources):
+    """Stack frames under a source column, keeping shared category dtypes."""
+    frames = [frame.copy(deep=False) for frame in frames]
+    for frame, source in zip(frames, sources):
+        frame.insert(0, SOURCE_COLUMN, source)
+    combined = concat_frames(frames)
+    combined[SOURCE_COLUMN] = pd.Categorical(
+        combined[SOURCE_COLUMN], categories=list(dict.fromkeys(sources))
+    )
+    return combined
+
+
+def _sheet_tasks(files, all_sheets):
+    """``(file_name, data, sheet, source, key)`` for every sheet to load."""
+    tasks = []
+    for file_name, data in files:
+        with stage("hash"):
+            digest = content_hash(data)
+        sheets = list_sheets(data, file_name) if all_sheets else [0]
+        for sheet in sheets:
+            source = f"{file_name} [{sheet}]" if len(sheets) > 1 else file_name
+            tasks.append((file_name, data, sheet, source, _dataset_key(digest, file_name, sheet)))
+    return tasks
+
+
+def _combined_key(tasks):
+    return ('combined', tuple(task[4] for task in tasks), tuple(task[3] for task in tasks))
+
+
+def find_cached(files, all_sheets=False):
+    """The dataset ``load_datasets`` would return, if it is ready without parsing.
+
+    Only hashes the files (and lists their sheets); None means a load is
+    needed.
+    """
+    tasks = _sheet_tasks(files, all_sheets)
+    if len(tasks) == 1:
+        return _cached_dataset(tasks[0][4])
+    return REGISTRY.get(_combined_key(tasks))
+
+
+def load_datasets(files, all_sheets=False, progress=None):
+    """Load several workbooks, and optionally every sheet, as one dataset.
+
+    ``files`` is a list of ``(file_name, data)`` pairs. Sheets missing from
+    the caches are parsed in parallel worker processes, since openpyxl holds
+    the GIL. A single sheet is returned as is; several are stacked with a
+    ``Source`` column naming the file (and sheet). ``progress(done, total)``
+    is called as sheets finish.
+    """
+    tasks = _sheet_tasks(files, all_sheets)
+
+    if len(tasks) == 1:
+        file_name, data, sheet, _, key = tasks[0]
+        return load_dataset(data, file_name, sheet, digest=key[0], progress=progress)
+
+    datasets = {}
+    pending = []
+    for file_name, data, sheet, _, key in tasks:
+        dataset = _cached_dataset(key)
+        if dataset is not None:
+            datasets[key] = dataset
+        else:
+            pending.append((file_name, data, sheet, key))
+
+    done = len(datasets)
+    if progress is not None:
+        progress(done, len(tasks))
+    # A worker killed mid-parse (out of memory, say) breaks the whole pool;
+    # the sheets not yet parsed are retried once on a new one
+    for attempt in range(2):
+        if not pending:
+            break
+        pool = _process_pool()
+        try:
+            futures = {
+                pool.submit(parse_sheet, data, file_name, sheet): key
+                for file_name, data, sheet, key in pending
+            }
+            # Wall time of the whole parallel parse, cache writes included
+            with stage("parse_workers"):
+                for future in as_completed(futures):
+                    key = futures[future]
+                    df, summary = future.result()
+                    datasets[key] = _store_dataset(key, df, summary)
+                    done += 1
+                    if progress is not None:
+                        progress(done, len(tasks))
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            if attempt:
+                raise
+        pending = [task for task in pending if task[3] not in datasets]
+
+    keys = [task[4] for task in tasks]
+    combined_key = _combined_key(tasks)
+    dataset = REGISTRY.get(combined_key)
+    if dataset is None:
+        parts = [datasets[key] for key in keys]
+        with stage("combine_sources"):
+            df = _concat_sources([part.df for part in parts], [task[3] for task in tasks])
+        summary = None
+        if all(list(part.df.columns) == list(parts[0].df.columns) for part in parts):
+            # Same columns everywhere, so the per-sheet summaries simply add up
+            summary = RunningSummary()
+            for part in parts:
+                summary.merge(part.summary)
+        dataset = REGISTRY.add(Dataset(combined_key, df, Schema.from_frame(df), summary))
+    return dataset
@@ -0,0 +1,211 @@
+"""Uploads parsed by a bounded pool of background workers, with admission control.
+
+Parsing a large workbook takes several times its file size in memory, so
+sessions uploading at once could together exhaust the pod. Each upload is
+instead submitted as a job with a memory estimate derived from its size.
+Jobs start in arrival order while the estimates of the running jobs, plus
+the upload bytes held by the waiting ones, fit in
+``DASHBOARD_INGEST_MEMORY_MB`` and a worker is free; the rest wait in a
+queue, and jobs that could never fit, or that find the queue full, are
+rejected at once. Uploads already parsed are served from the caches
+without queueing. Sessions poll their job for its queue position and
+parsing progress.
+"""
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from . import settings
+from .append import append_rows
+from .ingest import find_cached, load_datasets
+from .profiling import METRICS, Run, recording
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED, REJECTED = "queued", "running", "done", "failed", "rejected"
+
+
+class Rejected(RuntimeError):
+    """The upload was not admitted."""
+
+
+class IngestJob:
+    """One upload waiting for or being parsed; ``progress`` goes from 0 to 1.
+
+    ``work(files, progress)`` does the parsing; its return value becomes
+    ``result``. Stages timed on the worker thread are kept in ``profile``
+    for the session to add to its own run report.
+    """
+
+    def __init__(self, queue, job_id, files, work):
+        self.queue = queue
+        self.id = job_id
+        self.files = files
+        self.names = [name for name, _ in files]
+        self.work = work
+        self.size = sum(len(data) for _, data in files)
+        self.estimate = estimate_bytes(files)
+        self.state = QUEUED
+        self.progress = 0.0
+        self.done_count = 0
+        self.result = None
+        self.error = None
+        self.profile = Run()
+        self.submitted = time.monotonic()
+
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED, REJECTED)
+
+    @property
+    def position(self):
+        """1-based place in the queue, or 0 once the job has left it."""
+        return self.queue.position(self)
+
+    def _report(self, done, total):
+        self.done_count = done
+        self.progress = min(done / total, 1.0) if total else 0.0
+
+
+def estimate_bytes(files):
+    """Memory a parse of ``files`` (``(file_name, data)`` pairs) is expected to take.
+
+    Several files are parsed at once by up to ``INGEST_PROCESSES`` worker
+    processes, so at most that many of the largest are in flight, on top
+    of the uploaded bytes themselves.
+    """
+    sizes = [len(data) for _, data in files]
+    if not sizes:
+        return 0
+    parallel = min(settings.INGEST_PROCESSES, len(sizes))
+    return sum(sizes) + max(sizes) * settings.INGEST_MEMORY_FACTOR * parallel
+
+
+class IngestQueue:
+    """FIFO admission of jobs into a fixed number of workers and a memory budget."""
+
+    def __init__(self, workers, budget_bytes, max_queued):
+        self.workers = workers
+        self.budget_bytes = budget_bytes
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+        self._waiting = deque()
+        self._running = set()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, files, all_sheets=False):
+        """Queue ``files`` for ``load_datasets``; the job's result is the dataset.
+
+        A cached upload, or a rejected one, comes back already finished.
+        """
+        job = IngestJob(
+            self, next(self._ids), files,
+            lambda files, progress: load_datasets(files, all_sheets=all_sheets, progress=progress)
+        )
+        dataset = find_cached(files, all_sheets)
+        if dataset is not None:
+            job.result = dataset
+            job.state = DONE
+            job.progress = 1.0
+            job.files = None
+            return job
+        return self._enqueue(job)
+
+    def submit_append(self, base, file_name, data, key_cols):
+        """Queue ``append_rows``; the job's result is its ``(dataset, added, skipped)``."""
+        return self._enqueue(IngestJob(
+            self, next(self._ids), [(file_name, data)],
+            lambda files, progress: append_rows(base, files[0][1], file_name, key_cols)
+        ))
+
+    def _enqueue(self, job):
+        with self._lock:
+            if job.estimate > self.budget_bytes:
+                job.error = Rejected(
+                    f"upload needs about {job.estimate / 2**20:,.0f} MB to parse, more than "
+                    f"the {self.budget_bytes / 2**20:,.0f} MB allowed"
+                )
+            elif (len(self._waiting) >= self.max_queued
+                  or self._held_bytes() + job.size > self.budget_bytes):
+                job.error = Rejected("the server is busy with other uploads; please try again shortly")
+            if job.error is not None:
+                job.state = REJECTED
+                job.files = None
+                return job
+            self._waiting.append(job)
+            self._dispatch()
+        return job
+
+    def cancel(self, job):
+        """Drop ``job`` if it has not started; a running job is left to finish."""
+        with self._lock:
+            if job in self._waiting:
+                self._waiting.remove(job)
+                job.state = FAILED
+                job.error = Rejected("cancelled")
+                job.files = None
+
+    def position(self, job):
+        with self._lock:
+            try:
+                return self._waiting.index(job) + 1
+            except ValueError:
+                return 0
+
+    def usage(self):
+        """Jobs queued and running, and the memory they reserve.
+
+        Running jobs reserve their estimate, waiting ones the upload bytes
+        they hold.
+        """
+        with self._lock:
+            return {
+                "queued": len(self._waiting),
+                "running": len(self._running),
+                "reserved_bytes": self._held_bytes(),
+            }
+
+    def _held_bytes(self):
+        return (sum(job.estimate for job in self._running)
+                + sum(job.size for job in self._waiting))
+
+    def _dispatch(self):
+        # Strictly in arrival order, so a large upload is not starved by small ones.
+        # The head's own bytes are part of its estimate; with nothing running
+        # it always starts, so bytes held by the queue cannot stall it.
+        held = self._held_bytes()
+        while (self._waiting and len(self._running) < self.workers
+               and (not self._running
+                    or held - self._waiting[0].size + self._waiting[0].estimate <= self.budget_bytes)):
+            job = self._waiting.popleft()
+            held += job.estimate - job.size
+            job.state = RUNNING
+            self._running.add(job)
+            wait = time.monotonic() - job.submitted
+            METRICS.observe("ingest_queue_wait", wait)
+            job.profile.record("ingest_queue_wait", wait)
+            self._executor.submit(self._run, job)
+
+    def _run(self, job):
+        try:
+            with recording(job.profile):
+                job.result = job.work(job.files, job._report)
+            job.state = DONE
+        except Exception as exc:
+            logger.warning("Ingest job %s failed: %s", job.id, exc)
+            job.error = exc
+            job.state = FAILED
+        job.progress = 1.0
+        job.files = None
+        with self._lock:
+            self._running.discard(job)
+            self._dispatch()
+
+
+QUEUE = IngestQueue(
+    settings.INGEST_WORKERS, settings.INGEST_MEMORY_BUDGET_BYTES, settings.INGEST_QUEUE_LIMIT
+)
@@ -0,0 +1,162 @@
+"""Interface text of the dashboard in every language it offers.
+
+Shared by the app and the batch job, which builds figures with the
+default language's titles.
+"""
+DEFAULT_LANGUAGE = "English"
+
+LANGUAGES = {
+    "English": {
+        "title": "Business Intelligence Dashboard",
+        "upload": "Upload Excel File",
+        "upload_desc": "Upload an Excel file (.xlsx or .xls). The app will automatically detect date, numeric, and categorical columns and show analytical charts.",
+        "drag_drop": "Drag and drop file here",
+        "file_limit": "Limit 200MB per file • XLSX, XLS",
+        "processing": "Processing data...",
+        "data_preview": "Data Preview",
+        "kpi_section": "Key Performance Indicators",
+        "charts_section": "Analytical Charts",
+        "total_records": "Total Records",
+        "total_columns": "Total Columns",
+        "date_columns": "Date Columns",
+        "numeric_columns": "Numeric Columns",
+        "data_types": "Data Types Overview",
+        "missing_values": "Missing Values",
+        "time_series": "Time Series Analysis",
+        "distribution": "Distribution Analysis",
+        "correlation": "Correlation Matrix",
+        "category_analysis": "Category Analysis",
+        "top_categories": "Top Categories",
+        "download_data": "Download Processed Data",
+        "select_date_col": "Select Date Column",
+        "select_value_col": "Select Value Column",
+        "select_category_col": "Select Category Column",
+        "no_date_col": "No date column detected",
+        "no_numeric_col": "No numeric column detected",
+        "no_category_col": "No categorical column detected",
+        "error": "Error",
+        "success": "Success",
+        "file_uploaded": "File uploaded successfully",
+        "select_language": "Select Language",
+        "reset": "Reset",
+        "filter_data": "Filter Data",
+        "apply_filter": "Apply Filter",
+        "clear_filter": "Clear Filter",
+        "data_summary": "Data Summary",
+        "insights": "Insights",
+        "trend": "Trend",
+        "comparison": "Comparison",
+        "forecast": "Forecast",
+        "all_sheets": "Read all sheets",
+        "append_rows": "Append New Rows",
+        "append_desc": "Upload a workbook holding only the new rows to add them to the current data.",
+        "key_columns": "Key columns (rows whose key already exists are skipped)",
+        "append": "Append",
+        "rows_added": "rows added",
+        "rows_skipped": "duplicates skipped",
+        "queued": "Waiting in queue",
+        "retry": "Retry"
+    },
+    "Indonesia": {
+        "title": "Dasbor Bisnis Inteligensi",
+        "upload": "Unggah File Excel",
+        "upload_desc": "Unggah file Excel (.xlsx atau .xls). Aplikasi akan mendeteksi kolom tanggal, numerik, dan kategorikal secara otomatis dan menampilkan grafik analitis.",
+        "drag_drop": "Seret dan lepas file di sini",
+        "file_limit": "Batas 200MB per file • XLSX, XLS",
+        "processing": "Memproses data...",
+        "data_preview": "Pratinjau Data",
+        "kpi_section": "Indikator Kinerja Utama",
+        "charts_section": "Grafik Analitis",
+        "total_records": "Total Data",
+        "total_columns": "Total Kolom",
+        "date_columns": "Kolom Tanggal",
+        "numeric_columns": "Kolom Numerik",
+        "data_types": "Ringkasan Tipe Data",
+        "missing_values": "Nilai Kosong",
+        "time_series": "Analisis Deret Waktu",
+        "distribution": "Analisis Distribusi",
+        "correlation": "Matriks Korelasi",
+        "category_analysis": "Analisis Kategori",
+        "top_categories": "Kategori Teratas",
+        "download_data": "Unduh Data Hasil Olahan",
+        "select_date_col": "Pilih Kolom Tanggal",
+        "select_value_col": "Pilih Kolom Nilai",
+        "select_category_col": "Pilih Kolom Kategori",
+        "no_date_col": "Tidak ada kolom tanggal terdeteksi",
+        "no_numeric_col": "Tidak ada kolom numerik terdeteksi",
+        "no_category_col": "Tidak ada kolom kategorikal terdeteksi",
+        "error": "Error",
+        "success": "Berhasil",
+        "file_uploaded": "File berhasil diunggah",
+        "select_language": "Pilih Bahasa",
+        "reset": "Reset",
+        "filter_data": "Filter Data",
+        "apply_filter": "Terapkan Filter",
+        "clear_filter": "Hapus Filter",
+        "data_summary": "Ringkasan Data",
+        "insights": "Insights",
+        "trend": "Tren",
+        "comparison": "Perbandingan",
+        "forecast": "Perkiraan",
+        "all_sheets": "Baca semua sheet",
+        "append_rows": "Tambah Baris Baru",
+        "append_desc": "Unggah workbook yang hanya berisi baris baru untuk menambahkannya ke data saat ini.",
+        "key_columns": "Kolom kunci (baris dengan kunci yang sudah ada dilewati)",
+        "append": "Tambahkan",
+        "rows_added": "baris ditambahkan",
+        "rows_skipped": "duplikat dilewati",
+        "queued": "Menunggu dalam antrean",
+        "retry": "Coba lagi"
+    },
+    "中文": {
+        "title": "商业智能仪表板",
+        "upload": "上传 Excel 文件",
+        "upload_desc": "上传 Excel 文件（.xlsx 或 .xls）。应用将自动检测日期、数值和分类列，并显示分析图表。",
+        "drag_drop": "拖放文件到此处",
+        "file_limit": "每文件限制 200MB • XLSX, XLS",
+        "processing": "处理数据中...",
+        "data_preview": "数据预览",
+        "kpi_section": "关键绩效指标",
+        "charts_section": "分析图表",
+        "total_records": "总记录数",
+        "total_columns": "总列数",
+        "date_columns": "日期列",
+        "numeric_columns": "数值列",
+        "data_types": "数据类型概览",
+        "missing_values": "缺失值",
+        "time_series": "时间序列分析",
+        "distribution": "分布分析",
+        "correlation": "相关矩阵",
+        "category_analysis": "类别分析",
+        "top_categories": "顶级类别",
+        "download_data": "下载处理后的数据",
+        "select_date_col": "选择日期列",
+        "select_value_col": "选择数值列",
+        "select_category_col": "选择分类列",
+        "no_date_col": "未检测到日期列",
+        "no_numeric_col": "未检测到数值列",
+        "no_category_col": "未检测到分类列",
+        "error": "错误",
+        "success": "成功",
+        "file_uploaded": "文件上传成功",
+        "select_language": "选择语言",
+        "reset": "重置",
+        "filter_data": "筛选数据",
+        "apply_filter": "应用筛选",
+        "clear_filter": "清除筛选",
+        "data_summary": "数据摘要",
+        "insights": "洞察",
+        "trend": "趋势",
+        "comparison": "比较",
+        "forecast": "预测",
+        "all_sheets": "读取所有工作表",
+        "append_rows": "追加新行",
+        "append_desc": "上传仅包含新行的工作簿，将其追加到当前数据。",
+        "key_columns": "键列（键已存在的行将被跳过）",
+        "append": "追加",
+        "rows_added": "行已追加",
+        "rows_skipped": "重复行已跳过",
+        "queued": "排队等待中",
+        "retry": "重试"
+    }
+}
@@ -0,0 +1,73 @@
+"""Paging through a dataset's rows for the data preview.
+
+Sorting goes through a sort index computed once per column and direction;
+filters select from it with their cached masks. A page is then a slice of
+row positions, so only the rows on screen are gathered and sent to the
+browser, however deep into the data the page is.
+"""
+import numpy as np
+import pandas as pd
+
+from .aggregates import memoize
+from .filters import category_codes, combined_mask, filter_signature, sorted_index
+
+
+def _ascending_order(dataset, col):
+    series = dataset.df[col]
+    if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return sorted_index(dataset, col)[1]
+
+    # Text and categories: rank the distinct values, then sort rows by rank
+    codes, values = category_codes(dataset, col)
+    try:
+        by_value = values.argsort()
+    except TypeError:
+        by_value = values.astype(str).argsort()
+    ranks = np.empty(len(values) + 1, dtype=np.int64)
+    ranks[by_value] = np.arange(len(values))
+    # Code -1 lands on the trailing slot, after every value
+    ranks[-1] = len(values)
+    return np.argsort(ranks[codes], kind='stable')
+
+
+def sort_order(dataset, col, ascending=True):
+    """Row positions ordered by ``col``, missing values last either way."""
+    def compute():
+        order = _ascending_order(dataset, col)
+        missing = dataset.df[col].isna().to_numpy()[order]
+        present = order[~missing]
+        if not ascending:
+            present = present[::-1]
+        return np.concatenate([present, order[missing]])
+    return memoize(dataset, "sort_order", (col, ascending), compute, persist=False)
+
+
+def preview_rows(dataset, filters, sort_col=None, ascending=True):
+    """Positions of the rows passing ``filters``, in display order.
+
+    None stands for every row in stored order.
+    """
+    if not filters and sort_col is None:
+        return None
+
+    def compute():
+        mask = combined_mask(dataset, filters)
+        if sort_col is None:
+            return np.flatnonzero(mask)
+        order = sort_order(dataset, sort_col, ascending)
+        return order if mask is None else order[mask[order]]
+    return memoize(
+        dataset, "preview_rows", (filter_signature(filters), sort_col, ascending),
+        compute, persist=False
+    )
+
+
+def preview_page(dataset, filters, start, size, sort_col=None, ascending=True):
+    """``size`` rows from position ``start`` of the sorted, filtered rows.
+
+    The index holds each row's position in ``dataset``.
+    """
+    rows = preview_rows(dataset, filters, sort_col, ascending)
+    if rows is None:
+        return dataset.df.iloc[start:start + size]
+    return dataset.df.iloc[rows[start:start + size]]
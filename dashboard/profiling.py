@@ -0,0 +1,242 @@
+"""Stage-level timing for each script run, plus process-wide metrics.
+
+Code marks its expensive parts with ``with stage("parse"):``. Every stage
+is added to process-wide totals, exposed in Prometheus text format, and,
+when a run is active in the current thread, to that run's report for the
+sidebar Performance panel and the optional JSON log line.
+"""
+import contextvars
+import json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import settings
+
+logger = logging.getLogger(__name__)
+if settings.PROFILE_LOG and not logging.getLogger().handlers:
+    # Streamlit only configures its own loggers; give the JSON lines somewhere to go
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(asctime)s %(name)s %(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+
+_current_run = contextvars.ContextVar('dashboard_profile_run', default=None)
+
+
+def rss_bytes():
+    """Current resident set size of the process."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes():
+    """Highest resident set size the process has reached."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class _Metrics:
+    """Totals per stage since the process started."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.runs = 0
+
+    def observe(self, name, seconds):
+        with self._lock:
+            count, total, slowest = self.stages.get(name, (0, 0.0, 0.0))
+            self.stages[name] = (count + 1, total + seconds, max(slowest, seconds))
+
+    def count_run(self):
+        with self._lock:
+            self.runs += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stages), self.runs
+
+
+METRICS = _Metrics()
+
+
+class Run:
+    """Stage records for one script run."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = []
+        self.sizes = {}
+
+    def record(self, name, seconds):
+        self.stages.append({
+            'stage': name,
+            'seconds': round(seconds, 4),
+            'rss_mb': round(rss_bytes() / 1024 / 1024, 1),
+        })
+
+    def absorb(self, other):
+        """Add the stages ``other`` recorded, e.g. on a background worker."""
+        self.stages.extend(other.stages)
+
+    def note_frame(self, label, df, nbytes=None):
+        """Remember the size of a frame this run worked on."""
+        self.sizes[label] = {
+            'rows': len(df),
+            'columns': len(df.columns),
+            'mb': round((nbytes if nbytes is not None else df.memory_usage().sum()) / 1024 / 1024, 2),
+        }
+
+    def report(self):
+        return {
+            'total_seconds': round(time.perf_counter() - self.started, 4),
+            'peak_rss_mb': round(peak_rss_bytes() / 1024 / 1024, 1),
+            'stages': self.stages,
+            'frames': self.sizes,
+        }
+
+
+def start_run():
+    """Begin recording stages for the script run in this thread."""
+    run = Run()
+    _current_run.set(run)
+    return run
+
+
+def finish_run(run):
+    """Close ``run``, count it and log it; returns its report."""
+    _current_run.set(None)
+    METRICS.count_run()
+    report = run.report()
+    if settings.PROFILE_LOG:
+        logger.info(json.dumps(report, default=str))
+    return report
+
+
+def current_run():
+    return _current_run.get()
+
+
+@contextmanager
+def recording(run):
+    """Record the stages of the enclosed block to ``run``, on any thread."""
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+@contextmanager
+def stage(name):
+    """Time the enclosed block as stage ``name``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        METRICS.observe(name, seconds)
+        run = _current_run.get()
+        if run is not None:
+            run.record(name, seconds)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text():
+    """All metrics in the Prometheus text exposition format."""
+    from .ingest_queue import QUEUE
+    from .registry import REGISTRY
+
+    stages, runs = METRICS.snapshot()
+    usage = REGISTRY.usage()
+    ingest = QUEUE.usage()
+    lines = [
+        "# HELP dashboard_stage_seconds Time spent in each dashboard stage.",
+        "# TYPE dashboard_stage_seconds summary",
+    ]
+    for name, (count, total, _) in sorted(stages.items()):
+        lines.append(f'dashboard_stage_seconds_count{{stage="{_label(name)}"}} {count}')
+        lines.append(f'dashboard_stage_seconds_sum{{stage="{_label(name)}"}} {total:.6f}')
+    lines += [
+        "# HELP dashboard_stage_seconds_max Slowest single run of each stage.",
+        "# TYPE dashboard_stage_seconds_max gauge",
+    ]
+    for name, (_, _, slowest) in sorted(stages.items()):
+        lines.append(f'dashboard_stage_seconds_max{{stage="{_label(name)}"}} {slowest:.6f}')
+    lines += [
+        "# HELP dashboard_script_runs_total Full script runs since start.",
+        "# TYPE dashboard_script_runs_total counter",
+        f"dashboard_script_runs_total {runs}",
+        "# HELP dashboard_resident_memory_bytes Resident set size of the process.",
+        "# TYPE dashboard_resident_memory_bytes gauge",
+        f"dashboard_resident_memory_bytes {rss_bytes()}",
+        "# HELP dashboard_peak_resident_memory_bytes Highest resident set size so far.",
+        "# TYPE dashboard_peak_resident_memory_bytes gauge",
+        f"dashboard_peak_resident_memory_bytes {peak_rss_bytes()}",
+        "# HELP dashboard_datasets Datasets held in memory, all and in use by a session.",
+        "# TYPE dashboard_datasets gauge",
+        f'dashboard_datasets{{state="all"}} {usage["datasets"]}',
+        f'dashboard_datasets{{state="in_use"}} {usage["datasets_in_use"]}',
+        "# HELP dashboard_dataset_bytes Memory taken by datasets held in memory.",
+        "# TYPE dashboard_dataset_bytes gauge",
+        f'dashboard_dataset_bytes{{state="all"}} {usage["bytes"]}',
+        f'dashboard_dataset_bytes{{state="in_use"}} {usage["bytes_in_use"]}',
+        "# HELP dashboard_ingest_jobs Uploads waiting for or being parsed.",
+        "# TYPE dashboard_ingest_jobs gauge",
+        f'dashboard_ingest_jobs{{state="queued"}} {ingest["queued"]}',
+        f'dashboard_ingest_jobs{{state="running"}} {ingest["running"]}',
+        "# HELP dashboard_ingest_reserved_bytes Estimated memory of the uploads being parsed, and bytes held by those waiting.",
+        "# TYPE dashboard_ingest_reserved_bytes gauge",
+        f"dashboard_ingest_reserved_bytes {ingest['reserved_bytes']}",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') not in ('', '/metrics'):
+            self.send_error(404)
+            return
+        body = prometheus_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None):
+    """Serve ``/metrics`` on ``port`` in a daemon thread, once per process."""
+    global _server
+    port = settings.METRICS_PORT if port is None else port
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer(('0.0.0.0', port), _MetricsHandler)
+            except OSError as exc:
+                logger.warning("Metrics endpoint not started on port %s: %s", port, exc)
+                return None
+            threading.Thread(target=_server.serve_forever, name='metrics', daemon=True).start()
+        return _server
@@ -0,0 +1,138 @@
+"""Process-wide registry holding one shared copy of each dataset.
+
+Sessions do not keep their own frames. They ``acquire`` a handle on the
+registered dataset, which counts as a reference, and release it when they
+load something else or when their session state is garbage collected.
+Datasets with no references stay around as a cache and are evicted least
+recently used first once the memory budget or idle count is exceeded.
+"""
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+from . import settings
+
+logger = logging.getLogger(__name__)
+
+if int(pd.__version__.split('.')[0]) < 3:
+    # Shared frames must not see each other's writes; pandas 3 always works this way
+    pd.set_option('mode.copy_on_write', True)
+
+
+class DatasetHandle:
+    """A session's reference to a registered dataset.
+
+    ``dataset`` is shared with every other session holding the same
+    content and must be treated as read-only.
+    """
+
+    def __init__(self, registry, dataset):
+        self.dataset = dataset
+        self._release = weakref.finalize(self, registry._release, dataset.key)
+
+    def release(self):
+        self._release()
+
+    @property
+    def released(self):
+        return not self._release.alive
+
+
+class _Entry:
+    __slots__ = ('dataset', 'nbytes', 'refs')
+
+    def __init__(self, dataset):
+        self.dataset = dataset
+        self.nbytes = dataset.nbytes
+        self.refs = 0
+
+
+class DatasetRegistry:
+    def __init__(self, max_bytes, max_idle=None):
+        self.max_bytes = max_bytes
+        self.max_idle = max_idle
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """The registered dataset for ``key``, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry.dataset
+
+    def add(self, dataset):
+        """Register ``dataset`` and return the shared instance for its key.
+
+        If another session registered the same content first, that instance
+        is returned and ``dataset`` is dropped.
+        """
+        entry = _Entry(dataset)
+        with self._lock:
+            existing = self._entries.get(dataset.key)
+            if existing is not None:
+                self._entries.move_to_end(dataset.key)
+                return existing.dataset
+            self._entries[dataset.key] = entry
+            self._evict()
+        return dataset
+
+    def acquire(self, dataset):
+        """Register ``dataset`` if needed and return a counted handle on it."""
+        dataset = self.add(dataset)
+        with self._lock:
+            entry = self._entries.get(dataset.key)
+            if entry is None:  # evicted between add() and here
+                entry = self._entries[dataset.key] = _Entry(dataset)
+            entry.refs += 1
+            self._entries.move_to_end(dataset.key)
+            dataset = entry.dataset
+        return DatasetHandle(self, dataset)
+
+    def _release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.refs > 0:
+                entry.refs -= 1
+                self._evict()
+
+    def _evict(self):
+        idle = [key for key, entry in self._entries.items() if entry.refs == 0]
+        idle_count = len(idle)
+        total = sum(entry.nbytes for entry in self._entries.values())
+        for key in idle:
+            over_budget = total > self.max_bytes
+            too_many = self.max_idle is not None and idle_count > self.max_idle
+            if not (over_budget or too_many):
+                break
+            total -= self._entries.pop(key).nbytes
+            idle_count -= 1
+        if total > self.max_bytes:
+            logger.info("Datasets in use take %.0f MB, above the %.0f MB budget",
+                        total / 1024 / 1024, self.max_bytes / 1024 / 1024)
+
+    def usage(self):
+        """Current footprint, for sizing pods."""
+        with self._lock:
+            entries = list(self._entries.values())
+        in_use = [e for e in entries if e.refs]
+        return {
+            'datasets': len(entries),
+            'bytes': sum(e.nbytes for e in entries),
+            'datasets_in_use': len(in_use),
+            'bytes_in_use': sum(e.nbytes for e in in_use),
+            'references': sum(e.refs for e in entries),
+            'budget_bytes': self.max_bytes,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+REGISTRY = DatasetRegistry(settings.DATASET_BUDGET_BYTES, settings.DATASET_MAX_IDLE)
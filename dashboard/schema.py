@@ -0,0 +1,176 @@
+"""Column type inference for uploaded sheets.
+
+Columns are classified from a bounded, evenly spaced sample, and only the
+columns confirmed as dates are converted. Integers are downcast and
+repetitive text becomes ``category``, which shrinks the frame for every
+later step.
+"""
+import datetime as dt
+import warnings
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+from . import settings
+
+# Bump when inference changes so cached typed frames are rebuilt
+SCHEMA_VERSION = 4
+
+_FORMAT_PROBES = 5
+
+
+@dataclass
+class Schema:
+    date_cols: list = field(default_factory=list)
+    numeric_cols: list = field(default_factory=list)
+    categorical_cols: list = field(default_factory=list)
+    # column -> applied conversion, e.g. "datetime:%Y-%m-%d", "category", "int16"
+    conversions: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_frame(cls, df):
+        """Classify an already typed frame by dtype alone."""
+        schema = cls()
+        for col in df.columns:
+            dtype = df[col].dtype
+            if pd.api.types.is_datetime64_any_dtype(dtype):
+                schema.date_cols.append(col)
+            elif pd.api.types.is_numeric_dtype(dtype):
+                schema.numeric_cols.append(col)
+            else:
+                schema.categorical_cols.append(col)
+        return schema
+
+
+def _sample(series, size):
+    if len(series) > size:
+        series = series.iloc[np.linspace(0, len(series) - 1, size).astype(np.int64)]
+    return series.dropna()
+
+
+def _sniff_date_format(sample):
+    """Return ``(True, format)`` if ``sample`` holds dates, else ``(False, None)``.
+
+    A format of None means the values are already datetime objects. The
+    format depends on the sampled values alone, never on earlier uploads.
+    """
+    if sample.empty:
+        return False, None
+    if sample.map(lambda v: isinstance(v, (dt.date, np.datetime64))).all():
+        return True, None
+    if not sample.map(lambda v: isinstance(v, str)).all():
+        return False, None
+    # Numbers stored as text are not dates even if "%Y" would parse them
+    if pd.to_numeric(sample, errors='coerce').notna().mean() > 0.5:
+        return False, None
+
+    candidates = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for value in sample.drop_duplicates().head(_FORMAT_PROBES):
+            for dayfirst in (False, True):
+                fmt = guess_datetime_format(value, dayfirst=dayfirst)
+                if fmt is not None and fmt not in candidates:
+                    candidates.append(fmt)
+
+    # The format parsing the most of the sample wins; on a tie, as when
+    # every day is 12 or less, the first guess (month first) is kept
+    best, best_ratio = None, 0.0
+    for fmt in candidates:
+        ratio = pd.to_datetime(sample, format=fmt, errors='coerce').notna().mean()
+        if ratio > best_ratio:
+            best, best_ratio = fmt, ratio
+            if ratio == 1:
+                break
+    if best_ratio >= settings.DATE_MATCH_RATIO:
+        return True, best
+    return False, None
+
+
+def _is_low_cardinality(sample):
+    if sample.empty:
+        return False
+    try:
+        distinct = sample.nunique()
+    except TypeError:  # unhashable cell values
+        return False
+    return distinct <= len(sample) * settings.CATEGORY_MAX_RATIO
+
+
+def infer_schema(df, sample_rows=None):
+    """Classify every column of ``df`` from a sample without modifying it."""
+    sample_rows = sample_rows or settings.INFER_SAMPLE_ROWS
+    schema = Schema()
+    for col in df.columns:
+        series = df[col]
+        dtype = series.dtype
+
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            schema.date_cols.append(col)
+        elif pd.api.types.is_bool_dtype(dtype):
+            schema.numeric_cols.append(col)
+        elif pd.api.types.is_integer_dtype(dtype):
+            schema.numeric_cols.append(col)
+            schema.conversions[col] = "integer"
+        elif pd.api.types.is_numeric_dtype(dtype):
+            schema.numeric_cols.append(col)
+        elif isinstance(dtype, pd.CategoricalDtype):
+            schema.categorical_cols.append(col)
+        else:
+            sample = _sample(series, sample_rows)
+            is_date, fmt = _sniff_date_format(sample)
+            if is_date:
+                schema.date_cols.append(col)
+                schema.conversions[col] = f"datetime:{fmt or ''}"
+            else:
+                schema.categorical_cols.append(col)
+                if _is_low_cardinality(sample):
+                    schema.conversions[col] = "category"
+    return schema
+
+
+def too_lossy(series, converted):
+    """Whether converting ``series`` left more values missing than date detection tolerates."""
+    lost = int(converted.isna().sum() - series.isna().sum())
+    return lost > (1 - settings.DATE_MATCH_RATIO) * max(int(series.notna().sum()), 1)
+
+
+def _convert(series, conversion):
+    if conversion.startswith("datetime:"):
+        fmt = conversion.split(":", 1)[1] or None
+        converted = pd.to_datetime(series, format=fmt, errors='coerce')
+        # The sample matched; the rest of the column may not
+        if too_lossy(series, converted):
+            raise ValueError(f"{series.name} does not hold dates throughout")
+        return converted
+    if conversion == "integer":
+        return pd.to_numeric(series, downcast='integer')
+    if conversion == "category":
+        return series.astype('category')
+    return series
+
+
+def apply_schema(df, schema):
+    """Convert the columns named in ``schema`` in one pass.
+
+    Returns a shallow copy of ``df`` and the schema of the result; a column
+    whose conversion fails keeps its original dtype and is reclassified.
+    """
+    df = df.copy(deep=False)
+    applied = {}
+    for col, conversion in schema.conversions.items():
+        try:
+            converted = _convert(df[col], conversion)
+        except (TypeError, ValueError):
+            continue
+        df[col] = converted
+        applied[col] = str(converted.dtype) if conversion == "integer" else conversion
+    typed = Schema.from_frame(df)
+    typed.conversions = applied
+    return df, typed
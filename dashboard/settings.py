@@ -0,0 +1,96 @@
+"""Runtime settings for the dashboard engine.
+
+Every value can be overridden with an environment variable so pods can be
+tuned without a code change.
+"""
+import os
+import tempfile
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def _env_mb(name, default):
+    return int(float(os.environ.get(name, default)) * 1024 * 1024)
+
+
+# Datasets kept in memory, one copy per distinct content shared by all
+# sessions. Only datasets no session is using count against the limits.
+DATASET_BUDGET_BYTES = _env_mb("DASHBOARD_DATASET_BUDGET_MB", 512)
+DATASET_MAX_IDLE = _env_int("DASHBOARD_DATASET_MAX_IDLE", 16)
+
+# Columnar (Arrow IPC) copies of parsed workbooks on local disk, reused
+# across sessions and process restarts
+DISK_CACHE_DIR = os.environ.get(
+    "DASHBOARD_CACHE_DIR", os.path.join(tempfile.gettempdir(), "dashboard-cache")
+)
+DISK_CACHE_BYTES = _env_mb("DASHBOARD_DISK_CACHE_MB", 2048)
+
+# Column type inference
+INFER_SAMPLE_ROWS = _env_int("DASHBOARD_INFER_SAMPLE_ROWS", 2000)
+# Share of sampled values that must parse with one format to call a column a date
+DATE_MATCH_RATIO = float(os.environ.get("DASHBOARD_DATE_MATCH_RATIO", 0.95))
+# Text columns whose sampled distinct/total ratio is at most this become categories
+CATEGORY_MAX_RATIO = float(os.environ.get("DASHBOARD_CATEGORY_MAX_RATIO", 0.5))
+
+# .xlsx uploads at least this large are read in fixed-size row chunks
+STREAM_THRESHOLD_BYTES = _env_mb("DASHBOARD_STREAM_THRESHOLD_MB", 20)
+STREAM_CHUNK_ROWS = _env_int("DASHBOARD_STREAM_CHUNK_ROWS", 50000)
+
+# Memoized KPIs and chart aggregates, keyed by dataset and column selection
+AGGREGATE_CACHE_BYTES = _env_mb("DASHBOARD_AGGREGATE_CACHE_MB", 128)
+AGGREGATE_CACHE_MAX_ENTRIES = _env_int("DASHBOARD_AGGREGATE_CACHE_ENTRIES", 2048)
+# ... and the same results kept on disk across restarts and batch runs
+AGGREGATE_STORE_BYTES = _env_mb("DASHBOARD_AGGREGATE_STORE_MB", 256)
+# Row-sized results (sort orders, sorted indexes, filter masks), kept apart
+# so that the indexes of one session's dataset do not evict another's aggregates
+INDEX_CACHE_BYTES = _env_mb("DASHBOARD_INDEX_CACHE_MB", 512)
+
+# Distribution charts: at most this many outlier points are sent to the browser
+OUTLIER_SAMPLE_SIZE = _env_int("DASHBOARD_OUTLIER_SAMPLE_SIZE", 1000)
+
+# CSV/Excel downloads are generated on request by background threads and
+# kept on disk next to the columnar cache
+EXPORT_WORKERS = _env_int("DASHBOARD_EXPORT_WORKERS", 2)
+EXPORT_CACHE_BYTES = _env_mb("DASHBOARD_EXPORT_CACHE_MB", 1024)
+EXPORT_CHUNK_ROWS = _env_int("DASHBOARD_EXPORT_CHUNK_ROWS", 20000)
+
+# Time series: buckets allowed before "Auto" picks a coarser frequency,
+# points kept per trace after decimation, and the WebGL switch-over point
+TIMESERIES_MAX_BUCKETS = _env_int("DASHBOARD_TIMESERIES_MAX_BUCKETS", 5000)
+TIMESERIES_MAX_POINTS = _env_int("DASHBOARD_TIMESERIES_MAX_POINTS", 2000)
+WEBGL_THRESHOLD = _env_int("DASHBOARD_WEBGL_THRESHOLD", 1000)
+
+# Worker processes parsing several workbooks or sheets at once
+INGEST_PROCESSES = _env_int("DASHBOARD_INGEST_PROCESSES", os.cpu_count() or 1)
+
+# Uploads are parsed by this many background workers. Parsing a file is
+# assumed to need INGEST_MEMORY_FACTOR times its size; uploads start only
+# while the running ones fit in the budget, and at most INGEST_QUEUE_LIMIT wait
+INGEST_WORKERS = _env_int("DASHBOARD_INGEST_WORKERS", 2)
+INGEST_MEMORY_BUDGET_BYTES = _env_mb("DASHBOARD_INGEST_MEMORY_MB", 2048)
+INGEST_MEMORY_FACTOR = _env_int("DASHBOARD_INGEST_MEMORY_FACTOR", 10)
+INGEST_QUEUE_LIMIT = _env_int("DASHBOARD_INGEST_QUEUE_LIMIT", 20)
+
+# Category filters list at most this many of the most frequent values
+FILTER_MAX_OPTIONS = _env_int("DASHBOARD_FILTER_MAX_OPTIONS", 500)
+
+# Text columns with more distinct values than this are summarised by sketches
+# (HyperLogLog and a heavy-hitters summary tracking this many values)
+CATEGORY_EXACT_MAX = _env_int("DASHBOARD_CATEGORY_EXACT_MAX", 100000)
+CATEGORY_SKETCH_CAPACITY = _env_int("DASHBOARD_CATEGORY_SKETCH_CAPACITY", 1000)
+
+# Spearman correlations rank a sample of at most this many rows
+CORRELATION_SAMPLE_ROWS = _env_int("DASHBOARD_CORRELATION_SAMPLE_ROWS", 100000)
+
+# Per-category forecasts fit the series of at most this many of the most frequent values
+FORECAST_MAX_SERIES = _env_int("DASHBOARD_FORECAST_MAX_SERIES", 500)
+
+# Engine behind groupbys and other aggregates: "pandas" or "duckdb"
+QUERY_BACKEND = os.environ.get("DASHBOARD_QUERY_BACKEND", "pandas").lower()
+
+# Stage timings: a Prometheus text endpoint on this port (0 disables it) and
+# one JSON log line per rerun when DASHBOARD_PROFILE_LOG is set
+METRICS_PORT = _env_int("DASHBOARD_METRICS_PORT", 0)
+PROFILE_LOG = os.environ.get("DASHBOARD_PROFILE_LOG", "").lower() in ("1", "true", "yes")
@@ -0,0 +1,316 @@
+"""Chunked .xlsx reading for workbooks too large to parse in one go.
+
+``pd.read_excel`` materialises every cell of the sheet as a Python object
+before building the frame. Here openpyxl's read-only row iterator feeds
+fixed-size chunks that are parsed immediately, so only one chunk of raw
+cell objects is alive at a time. Column types are decided once the whole
+sheet has been read, so a workbook types the same whichever way it is read.
+"""
+import io
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from . import settings
+from .schema import apply_schema, infer_schema
+
+
+def _header_names(row):
+    names = []
+    seen = {}
+    for i, value in enumerate(row):
+        name = f"Unnamed: {i}" if value is None or value == "" else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _row_chunks(data, sheet, chunk_rows, progress):
+    """Yield ``(columns, rows)`` with at most ``chunk_rows`` value tuples per chunk.
+
+    Blank rows inside the data are kept, as ``pd.read_excel`` keeps them;
+    trailing ones are dropped.
+    """
+    from openpyxl import load_workbook
+
+    chunk_rows = chunk_rows or settings.STREAM_CHUNK_ROWS
+    source = io.BytesIO(data) if isinstance(data, (bytes, bytearray)) else data
+    workbook = load_workbook(source, read_only=True, data_only=True, keep_links=False)
+    try:
+        ws = workbook[sheet] if isinstance(sheet, str) else workbook.worksheets[sheet]
+        total_rows = ws.max_row - 1 if ws.max_row else None
+        # Dimension records can be stale; iterate whatever the sheet really holds
+        ws.reset_dimensions()
+
+        rows = ws.iter_rows(values_only=True)
+        columns = None
+        for row in rows:
+            if any(v is not None for v in row):
+                columns = _header_names(row)
+                break
+        if columns is None:
+            return
+
+        width = len(columns)
+        buffer = []
+        blank = 0
+        rows_read = 0
+        for row in rows:
+            if not any(v is not None for v in row):
+                blank += 1
+                continue
+            if blank:
+                buffer.extend([(None,) * width] * blank)
+                blank = 0
+            buffer.append(row[:width] + (None,) * (width - len(row)))
+            if len(buffer) >= chunk_rows:
+                rows_read += len(buffer)
+                yield columns, buffer
+                buffer = []
+                if progress is not None:
+                    progress(rows_read, total_rows)
+        if buffer:
+            rows_read += len(buffer)
+            yield columns, buffer
+        if progress is not None:
+            progress(rows_read, rows_read)
+    finally:
+        workbook.close()
+
+
+def iter_sheet_chunks(data, sheet=0, chunk_rows=None, progress=None):
+    """Yield raw DataFrames of at most ``chunk_rows`` rows from one sheet.
+
+    The first row is the header and trailing empty rows are skipped.
+    ``progress(rows_read, total_rows)`` is called after every chunk;
+    ``total_rows`` comes from the sheet's dimension record and may be None.
+    """
+    for columns, rows in _row_chunks(data, sheet, chunk_rows, progress):
+        yield pd.DataFrame.from_records(rows, columns=columns)
+
+
+def _cell(value):
+    # As pandas' openpyxl reader hands cells to its parser
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _is_text(dtype):
+    return not (
+        pd.api.types.is_numeric_dtype(dtype)
+        or pd.api.types.is_bool_dtype(dtype)
+        or pd.api.types.is_datetime64_any_dtype(dtype)
+    )
+
+
+def _compact(series):
+    """Repetitive text as a categorical while the rest of the sheet streams in."""
+    try:
+        return series.astype('category')
+    except TypeError:  # unhashable cell values
+        return series
+
+
+def _parse_chunk(columns, rows):
+    """Parse one chunk exactly as ``pd.read_excel`` parses a whole sheet.
+
+    Returns the parsed frame and, for columns parsed as numbers from text
+    such as "007", the text itself, which is needed again should a later
+    chunk hold text that is not a number.
+    """
+    from pandas.io.parsers import TextParser
+
+    cells = [[_cell(value) for value in row] for row in rows]
+    chunk = TextParser(cells, names=columns, header=None, skip_blank_lines=False).read()
+    texts = {}
+    for i, col in enumerate(columns):
+        part = chunk[col]
+        if _is_text(part.dtype):
+            chunk[col] = _compact(part)
+        elif any(isinstance(row[i], str) for row in cells):
+            raw = pd.Series([row[i] for row in cells], dtype=object)
+            texts[col] = _compact(raw.where(part.notna().to_numpy()))
+    return chunk, texts
+
+
+def _join(parts, texts):
+    """One column from its chunks, typed as if the sheet had been parsed at once."""
+    if not any(_is_text(part.dtype) for part in parts):
+        if any(pd.api.types.is_float_dtype(part.dtype) for part in parts):
+            # Booleans beside missing values are parsed as 0.0 and 1.0
+            parts = [
+                part.astype(np.float64) if pd.api.types.is_bool_dtype(part.dtype) else part
+                for part in parts
+            ]
+        return pd.concat(parts, ignore_index=True)
+    # Text anywhere keeps every value as it was read, numbers included
+    values = [np.asarray(texts.get(i, part), dtype=object) for i, part in enumerate(parts)]
+    return pd.Series(np.concatenate(values))
+
+
+class RunningSummary:
+    """Mergeable whole-dataset statistics accumulated chunk by chunk."""
+
+    def __init__(self):
+        self.rows = 0
+        self.missing = 0
+        # column -> [count, sum, min, max] over non-null values
+        self.numeric = {}
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        self.missing += int(chunk.isna().sum().sum())
+        for col in chunk.columns:
+            series = chunk[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):  # even of booleans
+                continue
+            if pd.api.types.is_bool_dtype(series.dtype):
+                series = series.astype(np.int8)
+            elif not pd.api.types.is_numeric_dtype(series.dtype):
+                continue
+            values = series.dropna().to_numpy(dtype=np.float64)
+            if not len(values):
+                self.numeric.setdefault(col, [0, 0.0, np.nan, np.nan])
+                continue
+            stats = [len(values), float(values.sum()), float(values.min()), float(values.max())]
+            self._merge_numeric(col, stats)
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.missing += other.missing
+        for col, stats in other.numeric.items():
+            self._merge_numeric(col, stats)
+        return self
+
+    def _merge_numeric(self, col, stats):
+        current = self.numeric.get(col)
+        if current is None or current[0] == 0:
+            self.numeric[col] = list(stats)
+        elif stats[0]:
+            current[0] += stats[0]
+            current[1] += stats[1]
+            current[2] = min(current[2], stats[2])
+            current[3] = max(current[3], stats[3])
+
+    def mean(self, col):
+        count, total = self.numeric[col][:2]
+        return total / count if count else np.nan
+
+    def mean_of_means(self, cols):
+        """Average of the column means, as shown in the KPI row."""
+        means = [self.mean(c) for c in cols if c in self.numeric]
+        means = [m for m in means if not np.isnan(m)]
+        return float(np.mean(means)) if means else np.nan
+
+    @classmethod
+    def from_frame(cls, df, chunk_rows=None):
+        chunk_rows = chunk_rows or settings.STREAM_CHUNK_ROWS
+        summary = cls()
+        for start in range(0, len(df), chunk_rows):
+            summary.update(df.iloc[start:start + chunk_rows])
+        return summary
+
+
+class PairwiseMoments:
+    """Mergeable sums giving the correlation of any pair of numeric columns.
+
+    For every pair, only rows where both values are present count: ``n``
+    holds those row counts, ``sums[i, j]`` and ``squares[i, j]`` the sum and
+    sum of squares of column ``i`` over them, and ``products`` the
+    cross-products. Values are shifted by a per-column reference first, so
+    large, tightly spread values do not cancel out in the squares.
+    """
+
+    def __init__(self, columns, shift):
+        k = len(columns)
+        self.columns = list(columns)
+        self.shift = np.asarray(shift, dtype=np.float64)
+        self.n = np.zeros((k, k))
+        self.sums = np.zeros((k, k))
+        self.squares = np.zeros((k, k))
+        self.products = np.zeros((k, k))
+
+    def update(self, chunk):
+        values = chunk[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        present = ~np.isnan(values)
+        x = np.where(present, values - self.shift, 0.0)
+        mask = present.astype(np.float64)
+        self.n += mask.T @ mask
+        self.sums += x.T @ mask
+        self.squares += (x * x).T @ mask
+        self.products += x.T @ x
+        return self
+
+    def merge(self, other):
+        if other.columns != self.columns or not np.array_equal(other.shift, self.shift):
+            raise ValueError("moments over different columns or shifts cannot be merged")
+        self.n += other.n
+        self.sums += other.sums
+        self.squares += other.squares
+        self.products += other.products
+        return self
+
+    def correlation(self, cols):
+        """Pearson correlation matrix of ``cols``, with pairwise-complete rows."""
+        idx = [self.columns.index(col) for col in cols]
+        ix = np.ix_(idx, idx)
+        n, sums = self.n[ix], self.sums[ix]
+        covariance = n * self.products[ix] - sums * sums.T
+        spread = n * self.squares[ix] - sums ** 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            matrix = covariance / np.sqrt(spread * spread.T)
+        matrix[(n < 2) | ~(spread > 0) | ~(spread.T > 0)] = np.nan
+        return pd.DataFrame(np.clip(matrix, -1.0, 1.0), index=list(cols), columns=list(cols))
+
+    @property
+    def nbytes(self):
+        return 4 * self.n.nbytes
+
+    @classmethod
+    def from_frame(cls, df, columns, chunk_rows=None):
+        chunk_rows = chunk_rows or settings.STREAM_CHUNK_ROWS
+        head = df[list(columns)].iloc[:chunk_rows].to_numpy(dtype=np.float64, na_value=np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # all-missing columns
+            shift = np.nan_to_num(np.nanmean(head, axis=0)) if len(head) else np.zeros(len(columns))
+        moments = cls(columns, shift)
+        for start in range(0, len(df), chunk_rows):
+            moments.update(df.iloc[start:start + chunk_rows])
+        return moments
+
+
+def read_workbook_chunked(data, sheet=0, chunk_rows=None, progress=None):
+    """Stream one sheet into a typed frame.
+
+    Each chunk is parsed as it arrives, with the same number and missing
+    value handling as ``pd.read_excel``; text is held as categoricals in
+    the meantime. Types are inferred once the whole sheet has been read,
+    so the result matches ``ingest.parse_sheet`` on the same workbook.
+    Returns ``(df, summary)``.
+    """
+    parts = {}
+    texts = {}
+    columns = []
+    for columns, rows in _row_chunks(data, sheet, chunk_rows, progress):
+        chunk, chunk_texts = _parse_chunk(columns, rows)
+        for col in columns:
+            if col in chunk_texts:
+                texts.setdefault(col, {})[len(parts.get(col, ()))] = chunk_texts[col]
+            parts.setdefault(col, []).append(chunk[col])
+
+    if not columns:
+        return pd.DataFrame(), RunningSummary()
+    raw = pd.DataFrame(
+        {col: _join(parts.pop(col), texts.pop(col, {})) for col in columns}, columns=columns
+    )
+    df, _ = apply_schema(raw, infer_schema(raw))
+    return df, RunningSummary.from_frame(df)
@@ -0,0 +1,90 @@
+"""Resampling and visually lossless decimation for the Time Series tab.
+
+Series are first summed per period, then thinned with Largest-Triangle-
+Three-Buckets (LTTB), which keeps the points that shape the line so peaks
+and dips survive even when most points are dropped.
+"""
+import numpy as np
+import pandas as pd
+
+from . import settings
+from .aggregates import memoize, time_series
+
+# Label -> pandas offset alias; "Raw" keeps every distinct timestamp
+FREQUENCIES = {
+    "Auto": "auto",
+    "Raw": None,
+    "Hour": "h",
+    "Day": "D",
+    "Week": "W",
+    "Month": "MS",
+}
+_PERIODS = [("h", pd.Timedelta(hours=1)), ("D", pd.Timedelta(days=1)),
+            ("W", pd.Timedelta(weeks=1)), ("MS", pd.Timedelta(days=31))]
+
+
+def auto_frequency(dataset, date_col):
+    """Finest frequency whose bucket count stays within the configured limit."""
+    def compute():
+        dates = dataset.df[date_col]
+        if dates.nunique() <= settings.TIMESERIES_MAX_BUCKETS:
+            return None
+        span = dates.max() - dates.min()
+        for freq, period in _PERIODS:
+            if span / period <= settings.TIMESERIES_MAX_BUCKETS:
+                return freq
+        return "YS"
+    return memoize(dataset, "auto_frequency", (date_col,), compute)
+
+
+def resolve_frequency(dataset, date_col, label):
+    freq = FREQUENCIES[label]
+    return auto_frequency(dataset, date_col) if freq == "auto" else freq
+
+
+def lttb(x, y, n_out):
+    """Indices of the ``n_out`` points LTTB keeps from the series ``(x, y)``."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Interior points split into n_out - 2 buckets; first and last are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket is the third triangle vertex
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def decimated_series(dataset, date_col, value_cols, freq, max_points=None):
+    """``{column: (x, y)}`` resampled to ``freq`` and capped at ``max_points`` each."""
+    max_points = max_points or settings.TIMESERIES_MAX_POINTS
+    value_cols = tuple(value_cols)
+
+    def compute():
+        frame = time_series(dataset, date_col, value_cols, freq)
+        x = frame[date_col].to_numpy()
+        x_num = frame[date_col].to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+        series = {}
+        for col in value_cols:
+            y = frame[col].to_numpy(dtype=np.float64)
+            keep = lttb(x_num, y, max_points)
+            series[col] = (x[keep], y[keep])
+        return series
+    return memoize(dataset, "decimated_series", (date_col, value_cols, freq, max_points), compute)
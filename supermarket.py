@@ -1,10 +1,16 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime
 import warnings
+from dashboard import aggregates, categories, charts, exports, forecast, ingest_queue, profiling, settings
+from dashboard.ingest import SOURCE_COLUMN
+from dashboard.languages import DEFAULT_LANGUAGE, LANGUAGES
+from dashboard.dataset import Dataset
+from dashboard.filters import filter_dataset, filter_options, value_bounds
+from dashboard.preview import preview_page
+from dashboard.registry import REGISTRY
+from dashboard.timeseries import FREQUENCIES, resolve_frequency
 warnings.filterwarnings('ignore')
 
 # Set page config
@@ -15,145 +21,37 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# ===================== MULTI-LANGUAGE SUPPORT =====================
-LANGUAGES = {
-    "English": {
-        "title": "Business Intelligence Dashboard",
-        "upload": "Upload Excel File",
-        "upload_desc": "Upload an Excel file (.xlsx or .xls). The app will automatically detect date, numeric, and categorical columns and show analytical charts.",
-        "drag_drop": "Drag and drop file here",
-        "file_limit": "Limit 200MB per file • XLSX, XLS",
-        "processing": "Processing data...",
-        "data_preview": "Data Preview",
-        "kpi_section": "Key Performance Indicators",
-        "charts_section": "Analytical Charts",
-        "total_records": "Total Records",
-        "total_columns": "Total Columns",
-        "date_columns": "Date Columns",
-        "numeric_columns": "Numeric Columns",
-        "data_types": "Data Types Overview",
-        "missing_values": "Missing Values",
-        "time_series": "Time Series Analysis",
-        "distribution": "Distribution Analysis",
-        "correlation": "Correlation Matrix",
-        "category_analysis": "Category Analysis",
-        "top_categories": "Top Categories",
-        "download_data": "Download Processed Data",
-        "select_date_col": "Select Date Column",
-        "select_value_col": "Select Value Column",
-        "select_category_col": "Select Category Column",
-        "no_date_col": "No date column detected",
-        "no_numeric_col": "No numeric column detected",
-        "no_category_col": "No categorical column detected",
-        "error": "Error",
-        "success": "Success",
-        "file_uploaded": "File uploaded successfully",
-        "select_language": "Select Language",
-        "reset": "Reset",
-        "filter_data": "Filter Data",
-        "apply_filter": "Apply Filter",
-        "clear_filter": "Clear Filter",
-        "data_summary": "Data Summary",
-        "insights": "Insights",
-        "trend": "Trend",
-        "comparison": "Comparison",
-        "forecast": "Forecast"
-    },
-    "Indonesia": {
-        "title": "Dasbor Bisnis Inteligensi",
-        "upload": "Unggah File Excel",
-        "upload_desc": "Unggah file Excel (.xlsx atau .xls). Aplikasi akan mendeteksi kolom tanggal, numerik, dan kategorikal secara otomatis dan menampilkan grafik analitis.",
-        "drag_drop": "Seret dan lepas file di sini",
-        "file_limit": "Batas 200MB per file • XLSX, XLS",
-        "processing": "Memproses data...",
-        "data_preview": "Pratinjau Data",
-        "kpi_section": "Indikator Kinerja Utama",
-        "charts_section": "Grafik Analitis",
-        "total_records": "Total Data",
-        "total_columns": "Total Kolom",
-        "date_columns": "Kolom Tanggal",
-        "numeric_columns": "Kolom Numerik",
-        "data_types": "Ringkasan Tipe Data",
-        "missing_values": "Nilai Kosong",
-        "time_series": "Analisis Deret Waktu",
-        "distribution": "Analisis Distribusi",
-        "correlation": "Matriks Korelasi",
-        "category_analysis": "Analisis Kategori",
-        "top_categories": "Kategori Teratas",
-        "download_data": "Unduh Data Hasil Olahan",
-        "select_date_col": "Pilih Kolom Tanggal",
-        "select_value_col": "Pilih Kolom Nilai",
-        "select_category_col": "Pilih Kolom Kategori",
-        "no_date_col": "Tidak ada kolom tanggal terdeteksi",
-        "no_numeric_col": "Tidak ada kolom numerik terdeteksi",
-        "no_category_col": "Tidak ada kolom kategorikal terdeteksi",
-        "error": "Error",
-        "success": "Berhasil",
-        "file_uploaded": "File berhasil diunggah",
-        "select_language": "Pilih Bahasa",
-        "reset": "Reset",
-        "filter_data": "Filter Data",
-        "apply_filter": "Terapkan Filter",
-        "clear_filter": "Hapus Filter",
-        "data_summary": "Ringkasan Data",
-        "insights": "Insights",
-        "trend": "Tren",
-        "comparison": "Perbandingan",
-        "forecast": "Perkiraan"
-    },
-    "中文": {
-        "title": "商业智能仪表板",
-        "upload": "上传 Excel 文件",
-        "upload_desc": "上传 Excel 文件（.xlsx 或 .xls）。应用将自动检测日期、数值和分类列，并显示分析图表。",
-        "drag_drop": "拖放文件到此处",
-        "file_limit": "每文件限制 200MB • XLSX, XLS",
-        "processing": "处理数据中...",
-        "data_preview": "数据预览",
-        "kpi_section": "关键绩效指标",
-        "charts_section": "分析图表",
-        "total_records": "总记录数",
-        "total_columns": "总列数",
-        "date_columns": "日期列",
-        "numeric_columns": "数值列",
-        "data_types": "数据类型概览",
-        "missing_values": "缺失值",
-        "time_series": "时间序列分析",
-        "distribution": "分布分析",
-        "correlation": "相关矩阵",
-        "category_analysis": "类别分析",
-        "top_categories": "顶级类别",
-        "download_data": "下载处理后的数据",
-        "select_date_col": "选择日期列",
-        "select_value_col": "选择数值列",
-        "select_category_col": "选择分类列",
-        "no_date_col": "未检测到日期列",
-        "no_numeric_col": "未检测到数值列",
-        "no_category_col": "未检测到分类列",
-        "error": "错误",
-        "success": "成功",
-        "file_uploaded": "文件上传成功",
-        "select_language": "选择语言",
-        "reset": "重置",
-        "filter_data": "筛选数据",
-        "apply_filter": "应用筛选",
-        "clear_filter": "清除筛选",
-        "data_summary": "数据摘要",
-        "insights": "洞察",
-        "trend": "趋势",
-        "comparison": "比较",
-        "forecast": "预测"
-    }
-}
+# Stage timings for this run; /metrics is served when DASHBOARD_METRICS_PORT is set
+profiling.start_metrics_server()
+profile_run = profiling.start_run()
+
+# Chart libraries load in the background while the first visitor picks a file
+charts.warm_up()
 
 # Initialize session state
 if 'language' not in st.session_state:
-    st.session_state.language = "English"
+    st.session_state.language = DEFAULT_LANGUAGE
 if 'df' not in st.session_state:
     st.session_state.df = None
 if 'processed' not in st.session_state:
     st.session_state.processed = False
 if 'file_name' not in st.session_state:
     st.session_state.file_name = None
+if 'upload_id' not in st.session_state:
+    st.session_state.upload_id = None
+if 'dataset' not in st.session_state:
+    st.session_state.dataset = None
+if 'dataset_handle' not in st.session_state:
+    st.session_state.dataset_handle = None
+if 'view_handle' not in st.session_state:
+    st.session_state.view_handle = None
+if 'filters' not in st.session_state:
+    st.session_state.filters = {}
+if 'ingest_job' not in st.session_state:
+    st.session_state.ingest_job = None
+    st.session_state.ingest_upload_id = None
+if 'append_job' not in st.session_state:
+    st.session_state.append_job = None
 
 # ===================== SIDEBAR =====================
 with st.sidebar:
@@ -177,6 +75,17 @@ with st.sidebar:
     st.markdown("**Last Updated:** Dec 2024")
     st.markdown("**Developer:** Business Analytics Team")
     
+    # Shared dataset memory across all sessions of this server
+    usage = REGISTRY.usage()
+    st.caption(
+        f"Datasets in memory: {usage['datasets']} "
+        f"({usage['bytes'] / 1024 / 1024:.1f} MB, {usage['datasets_in_use']} in use)"
+    )
+    
+    # Filled in at the end of the run, once every stage has been timed
+    show_performance = st.toggle("⏱️ Performance", value=False)
+    performance_panel = st.empty()
+    
     st.markdown("---")
     st.markdown("### 💡 Quick Tips")
     st.markdown("1. Ensure Excel file is not open")
@@ -191,65 +100,145 @@ st.markdown("---")
 st.header(f"📁 {lang['upload']}")
 st.write(lang['upload_desc'])
 
-uploaded_file = st.file_uploader(
+uploaded_files = st.file_uploader(
     lang['drag_drop'],
     type=['xlsx', 'xls'],
-    help=lang['file_limit']
+    help=lang['file_limit'],
+    accept_multiple_files=True
 )
+all_sheets = st.checkbox(lang['all_sheets'], value=False)
 
-# Process uploaded file
-if uploaded_file is not None:
-    try:
-        with st.spinner(lang['processing']):
-            # Read Excel file
-            if uploaded_file.name.endswith('.xls'):
-                df = pd.read_excel(uploaded_file, engine='xlrd')
-            else:
-                df = pd.read_excel(uploaded_file, engine='openpyxl')
+def job_status(job):
+    """Queue position or progress of a background parse; reruns the page when it ends."""
+    def status():
+        if job.state == ingest_queue.QUEUED:
+            st.info(f"⏳ {lang['queued']}: {job.position} / {ingest_queue.QUEUE.usage()['queued']}")
+        else:
+            st.progress(job.progress, text=f"{lang['processing']} {job.done_count:,}")
+        if job.finished:
+            st.rerun()
+    
+    # Only the status refreshes while the job waits or runs
+    st.fragment(status, run_every=1.0)()
+
+# Process uploaded files
+if uploaded_files:
+    # Parse and type each upload once, in the background; later reruns reuse the session's frame
+    upload_id = (tuple(f.file_id for f in uploaded_files), all_sheets)
+    if st.session_state.upload_id != upload_id:
+        job = st.session_state.ingest_job
+        if job is None or st.session_state.ingest_upload_id != upload_id:
+            # A newer upload replaces one still waiting
+            if job is not None:
+                ingest_queue.QUEUE.cancel(job)
+            job = ingest_queue.QUEUE.submit(
+                [(f.name, f.getvalue()) for f in uploaded_files],
+                all_sheets=all_sheets
+            )
+            st.session_state.ingest_job = job
+            st.session_state.ingest_upload_id = upload_id
+        
+        if job.state == ingest_queue.DONE:
+            profile_run.absorb(job.profile)
+            # Sessions share one registered copy of each dataset
+            if st.session_state.dataset_handle is not None:
+                st.session_state.dataset_handle.release()
+            handle = REGISTRY.acquire(job.result)
             
             # Store in session state
-            st.session_state.df = df
+            st.session_state.dataset_handle = handle
+            st.session_state.dataset = handle.dataset
+            st.session_state.df = handle.dataset.df
             st.session_state.processed = True
-            st.session_state.file_name = uploaded_file.name
-            
-            st.success(f"✅ {lang['file_uploaded']}: {uploaded_file.name}")
+            st.session_state.file_name = ", ".join(f.name for f in uploaded_files)
+            st.session_state.upload_id = upload_id
+            st.session_state.filters = {}
+            st.session_state.filter_cols = []
+            st.session_state.ingest_job = None
+            # An append still pending was for the previous data
+            if st.session_state.append_job is not None:
+                ingest_queue.QUEUE.cancel(st.session_state.append_job)
+                st.session_state.append_job = None
+        elif job.finished:
+            st.error(f"❌ {lang['error']}: {job.error}")
+            if job.state == ingest_queue.FAILED:
+                st.info("💡 Make sure you have openpyxl installed: `pip install openpyxl`")
+            if st.button(f"🔁 {lang['retry']}", key="ingest_retry"):
+                st.session_state.ingest_job = None
+                st.rerun()
+        else:
+            job_status(job)
+    
+    if st.session_state.upload_id == upload_id:
+        st.success(f"✅ {lang['file_uploaded']}: {st.session_state.file_name}")
+
+# Append only the rows of a new workbook to the loaded data
+if st.session_state.processed and st.session_state.dataset is not None:
+    with st.expander(f"➕ {lang['append_rows']}"):
+        delta_file = st.file_uploader(
+            lang['append_desc'],
+            type=['xlsx', 'xls'],
+            key="append_file"
+        )
+        key_columns = st.multiselect(
+            lang['key_columns'],
+            [col for col in st.session_state.dataset.df.columns if col != SOURCE_COLUMN],
+            key="append_key"
+        )
+        
+        if delta_file is not None and st.button(f"➕ {lang['append']}", key="append_button"):
+            # Parsed in the background under the same admission control as uploads
+            if st.session_state.append_job is not None:
+                ingest_queue.QUEUE.cancel(st.session_state.append_job)
+            st.session_state.append_job = ingest_queue.QUEUE.submit_append(
+                st.session_state.dataset,
+                delta_file.name,
+                delta_file.getvalue(),
+                key_columns
+            )
+        
+        job = st.session_state.append_job
+        if job is not None and job.state == ingest_queue.DONE:
+            st.session_state.append_job = None
+            profile_run.absorb(job.profile)
+            dataset, added, skipped = job.result
+            if dataset is not st.session_state.dataset:
+                # Hold the merged dataset and let go of the previous one
+                if st.session_state.dataset_handle is not None:
+                    st.session_state.dataset_handle.release()
+                handle = REGISTRY.acquire(dataset)
+                st.session_state.dataset_handle = handle
+                st.session_state.dataset = handle.dataset
+                st.session_state.df = handle.dataset.df
+                st.session_state.file_name += f" + {job.names[0]}"
+                st.session_state.filters = {}
+                st.session_state.filter_cols = []
             
-    except Exception as e:
-        st.error(f"❌ {lang['error']}: {str(e)}")
-        st.info("💡 Make sure you have openpyxl installed: `pip install openpyxl`")
+            st.success(f"✅ {added:,} {lang['rows_added']}, {skipped:,} {lang['rows_skipped']}")
+        elif job is not None and job.finished:
+            st.session_state.append_job = None
+            st.error(f"❌ {lang['error']}: {job.error}")
+        elif job is not None:
+            job_status(job)
 
 # Display dashboard if data is available
 if st.session_state.processed and st.session_state.df is not None:
-    df = st.session_state.df
-    
-    # Detect column types
-    date_cols = []
-    numeric_cols = []
-    categorical_cols = []
-    
-    for col in df.columns:
-        # Try to detect date columns
-        try:
-            df[col] = pd.to_datetime(df[col], errors='ignore')
-            if df[col].dtype == 'datetime64[ns]':
-                date_cols.append(col)
-                continue
-        except:
-            pass
-        
-        # Check if numeric
-        if pd.api.types.is_numeric_dtype(df[col]):
-            numeric_cols.append(col)
-        else:
-            categorical_cols.append(col)
+    # Column types were inferred at upload; frames set elsewhere are classified by dtype
+    if st.session_state.dataset is None or st.session_state.dataset.df is not st.session_state.df:
+        st.session_state.dataset = Dataset.from_frame(st.session_state.df)
+    dataset = st.session_state.dataset
+    df = dataset.df
+    date_cols = dataset.schema.date_cols
+    numeric_cols = dataset.schema.numeric_cols
+    categorical_cols = dataset.schema.categorical_cols
     
     # ===================== SIDEBAR FILTERS =====================
     with st.sidebar:
         st.markdown("---")
         st.header(f"🔧 {lang['filter_data']}")
         
-        # Row limit
-        row_limit = st.slider("Rows to display", 5, 100, 20)
+        # Preview page size
+        row_limit = st.slider("Rows per page", 5, 100, 20)
         
         # Column selection
         if numeric_cols:
@@ -270,22 +259,159 @@ if st.session_state.processed and st.session_state.df is not None:
             selected_date = None
         
         if categorical_cols:
+            # Distinct counts of the unfiltered data, so labels stay put while filtering
+            category_labels = {}
+            for col in categorical_cols:
+                count, exact = categories.cardinality(dataset, col)
+                category_labels[col] = f"{col} ({'' if exact else '≈'}{count:,})"
+            
             selected_category = st.selectbox(
                 f"🏷️ {lang['select_category_col']}",
-                categorical_cols
+                categorical_cols,
+                format_func=category_labels.get
             )
         else:
             selected_category = None
         
+        # Row filters; values take effect when the form is applied
+        st.markdown("---")
+        filter_cols = st.multiselect(
+            f"🔎 {lang['filter_data']}",
+            date_cols + numeric_cols + categorical_cols,
+            key="filter_cols"
+        )
+        
+        # Removing a column from the list drops its filter
+        st.session_state.filters = {
+            col: spec for col, spec in st.session_state.filters.items() if col in filter_cols
+        }
+        
+        if filter_cols:
+            with st.form("filter_form"):
+                pending_filters = {}
+                for col in filter_cols:
+                    current = st.session_state.filters.get(col)
+                    
+                    if col in categorical_cols:
+                        options = filter_options(dataset, col)
+                        chosen = st.multiselect(
+                            str(col),
+                            options,
+                            default=[v for v in current[1] if v in options] if current else [],
+                            key=f"filter_{col}"
+                        )
+                        if chosen:
+                            pending_filters[col] = ('in', tuple(chosen))
+                        continue
+                    
+                    low, high = value_bounds(dataset, col)
+                    if pd.isna(low) or low == high:
+                        continue
+                    
+                    if col in date_cols:
+                        picked = st.date_input(
+                            str(col),
+                            value=(current[1].date(), current[2].date()) if current else (low.date(), high.date()),
+                            min_value=low.date(),
+                            max_value=high.date(),
+                            key=f"filter_{col}"
+                        )
+                        if len(picked) == 2 and (picked[0] > low.date() or picked[1] < high.date()):
+                            # Inclusive of the whole last day
+                            end = pd.Timestamp(picked[1]) + pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+                            pending_filters[col] = ('range', pd.Timestamp(picked[0]), end)
+                    else:
+                        picked = st.slider(
+                            str(col),
+                            float(low),
+                            float(high),
+                            value=(float(current[1]), float(current[2])) if current else (float(low), float(high)),
+                            key=f"filter_{col}"
+                        )
+                        if picked != (float(low), float(high)):
+                            pending_filters[col] = ('range', picked[0], picked[1])
+                
+                if st.form_submit_button(lang['apply_filter']):
+                    st.session_state.filters = pending_filters
+        
+        def clear_filters():
+            st.session_state.filters = {}
+            st.session_state.filter_cols = []
+        
+        if st.session_state.filters:
+            st.button(lang['clear_filter'], on_click=clear_filters)
+        
         # Reset button
         if st.button(f"🔄 {lang['reset']}"):
+            for handle_name in ('dataset_handle', 'view_handle'):
+                if st.session_state[handle_name] is not None:
+                    st.session_state[handle_name].release()
+                st.session_state[handle_name] = None
             st.session_state.df = None
+            st.session_state.dataset = None
+            st.session_state.filters = {}
             st.session_state.processed = False
+            st.session_state.upload_id = None
             st.rerun()
     
+    # Everything below works on the filtered rows
+    total_rows = len(df)
+    source_dataset = dataset
+    profile_run.note_frame("dataset", df, dataset.nbytes)
+    with profiling.stage("filters"):
+        dataset = filter_dataset(dataset, st.session_state.filters)
+    
+    # Hold the filtered view while it is shown, so reruns reuse it
+    view_handle = st.session_state.view_handle
+    if view_handle is not None and (dataset is source_dataset or view_handle.dataset.key != dataset.key):
+        view_handle.release()
+        view_handle = None
+    if view_handle is None and dataset is not source_dataset:
+        view_handle = REGISTRY.acquire(dataset)
+    st.session_state.view_handle = view_handle
+    if view_handle is not None:
+        dataset = view_handle.dataset
+    df = dataset.df
+    if st.session_state.filters:
+        profile_run.note_frame("filtered", df, dataset.nbytes)
+    
     # ===================== DATA PREVIEW =====================
     st.header(f"🔍 {lang['data_preview']}")
-    st.dataframe(df.head(row_limit), use_container_width=True)
+    if st.session_state.filters:
+        st.caption(f"🔎 {len(df):,} / {total_rows:,}")
+    
+    # One page of rows at a time, sorted and filtered through cached indexes
+    prev_col1, prev_col2, prev_col3 = st.columns([2, 1, 1])
+    with prev_col1:
+        sort_col = st.selectbox(
+            "Sort by",
+            [None] + list(df.columns),
+            format_func=lambda col: "—" if col is None else str(col),
+            key="preview_sort"
+        )
+    with prev_col2:
+        ascending = st.radio(
+            "Order",
+            [True, False],
+            format_func=lambda asc: "Ascending" if asc else "Descending",
+            horizontal=True,
+            key="preview_ascending",
+            disabled=sort_col is None
+        )
+    n_pages = max(1, -(-len(df) // row_limit))
+    # Filtering may leave fewer pages than the one shown
+    if st.session_state.get("preview_page", 1) > n_pages:
+        st.session_state.preview_page = n_pages
+    with prev_col3:
+        page = st.number_input("Page", min_value=1, max_value=n_pages, step=1, key="preview_page")
+    
+    start = (page - 1) * row_limit
+    with profiling.stage("preview"):
+        st.dataframe(
+            preview_page(source_dataset, st.session_state.filters, start, row_limit, sort_col, ascending),
+            width='stretch'
+        )
+    st.caption(f"{min(start + 1, len(df)):,}–{min(start + row_limit, len(df)):,} / {len(df):,} · {page} / {n_pages}")
     
     # ===================== KPI SECTION =====================
     st.header(f"📈 {lang['kpi_section']}")
@@ -307,20 +433,20 @@ if st.session_state.processed and st.session_state.df is not None:
     col5, col6, col7, col8 = st.columns(4)
     
     with col5:
-        missing_total = df.isnull().sum().sum()
+        missing_total = dataset.summary.missing
         st.metric(lang['missing_values'], missing_total)
     
     with col6:
-        duplicate_rows = df.duplicated().sum()
+        duplicate_rows = aggregates.duplicate_rows(dataset)
         st.metric("Duplicate Rows", duplicate_rows)
     
     with col7:
-        memory_usage = df.memory_usage(deep=True).sum() / 1024 / 1024
+        memory_usage = aggregates.memory_usage_mb(dataset)
         st.metric("Memory Usage (MB)", f"{memory_usage:.2f}")
     
     with col8:
         if numeric_cols:
-            avg_numeric = df[numeric_cols].mean().mean()
+            avg_numeric = dataset.summary.mean_of_means(numeric_cols)
             st.metric("Avg Numeric Value", f"{avg_numeric:.2f}")
     
     st.markdown("---")
@@ -328,62 +454,44 @@ if st.session_state.processed and st.session_state.df is not None:
     # ===================== CHARTS SECTION =====================
     st.header(f"📊 {lang['charts_section']}")
     
-    # Create tabs for charts
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "📊 Data Types", 
-        "📈 Time Series", 
-        "📊 Distributions", 
-        "🔗 Correlations", 
-        "🏷️ Categories"
-    ])
-    
-    with tab1:
+    # Each tab is a fragment: its own widgets rerun only that tab
+    @st.fragment
+    def data_types_tab(dataset):
         # Data Types Distribution
         st.subheader(lang['data_types'])
-        dtype_counts = df.dtypes.astype(str).value_counts().reset_index()
-        dtype_counts.columns = ['Data Type', 'Count']
         
-        if not dtype_counts.empty:
-            fig1 = px.pie(
-                dtype_counts, 
-                values='Count', 
-                names='Data Type',
-                title=lang['data_types'],
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            st.plotly_chart(fig1, use_container_width=True)
+        if not aggregates.dtype_counts(dataset).empty:
+            fig1 = charts.dtype_pie(dataset, lang['data_types'])
+            st.plotly_chart(fig1, width='stretch')
     
-    with tab2:
+    @st.fragment
+    def time_series_tab(dataset, selected_date, selected_numeric):
         # Time Series Analysis
         if selected_date and selected_numeric:
             st.subheader(lang['time_series'])
             
-            # Aggregate by date
-            time_series_df = df.groupby(selected_date)[selected_numeric].sum().reset_index()
-            
-            fig2 = go.Figure()
-            for col in selected_numeric:
-                fig2.add_trace(go.Scatter(
-                    x=time_series_df[selected_date],
-                    y=time_series_df[col],
-                    mode='lines+markers',
-                    name=col,
-                    line=dict(width=2)
-                ))
+            frequency = st.selectbox(
+                "Frequency:",
+                list(FREQUENCIES),
+                key="ts_freq"
+            )
             
-            fig2.update_layout(
-                title=f"{lang['trend']} Analysis",
-                xaxis_title=selected_date,
-                yaxis_title="Value",
-                hovermode='x unified',
-                height=500
+            # Resample, then thin each trace to a fixed number of points with LTTB
+            freq = resolve_frequency(dataset, selected_date, frequency)
+            fig2 = charts.time_series_figure(
+                dataset,
+                selected_date,
+                selected_numeric,
+                freq,
+                title=f"{lang['trend']} Analysis"
             )
             
-            st.plotly_chart(fig2, use_container_width=True)
+            st.plotly_chart(fig2, width='stretch')
         else:
             st.info("Select a date column and numeric columns for time series analysis")
     
-    with tab3:
+    @st.fragment
+    def distributions_tab(dataset, selected_numeric):
         # Distribution Analysis
         if selected_numeric:
             st.subheader(lang['distribution'])
@@ -396,143 +504,235 @@ if st.session_state.processed and st.session_state.df is not None:
             
             col_dist1, col_dist2 = st.columns(2)
             
+            # Bins and box statistics are computed here; only they reach the browser
             with col_dist1:
                 # Histogram
-                fig3a = px.histogram(
-                    df, 
-                    x=selected_var,
+                fig3a = charts.histogram(
+                    dataset,
+                    selected_var,
                     title=f"Histogram of {selected_var}",
-                    nbins=30,
-                    color_discrete_sequence=['#636EFA'],
-                    marginal="box"
+                    color='#636EFA'
                 )
                 fig3a.update_layout(height=400)
-                st.plotly_chart(fig3a, use_container_width=True)
+                st.plotly_chart(fig3a, width='stretch')
             
             with col_dist2:
                 # Box plot
-                fig3b = px.box(
-                    df, 
-                    y=selected_var,
+                fig3b = charts.box(
+                    dataset,
+                    selected_var,
                     title=f"Box Plot of {selected_var}",
-                    color_discrete_sequence=['#00CC96']
+                    color='#00CC96'
                 )
                 fig3b.update_layout(height=400)
-                st.plotly_chart(fig3b, use_container_width=True)
+                st.plotly_chart(fig3b, width='stretch')
         else:
             st.info("Select numeric columns for distribution analysis")
     
-    with tab4:
+    @st.fragment
+    def correlations_tab(dataset, selected_numeric):
         # Correlation Matrix
         if len(selected_numeric) > 1:
             st.subheader(lang['correlation'])
             
-            corr_matrix = df[selected_numeric].corr()
-            
-            fig4 = px.imshow(
-                corr_matrix,
-                text_auto=True,
-                aspect="auto",
-                color_continuous_scale='RdBu_r',
-                title=lang['correlation'],
-                height=500
+            corr_method = st.radio(
+                "Method",
+                ["pearson", "spearman"],
+                format_func=str.title,
+                horizontal=True,
+                key="corr_method"
             )
-            st.plotly_chart(fig4, use_container_width=True)
+            if corr_method == "spearman":
+                st.caption(f"Ranked over a sample of up to {settings.CORRELATION_SAMPLE_ROWS:,} rows")
+            fig4 = charts.correlation_heatmap(
+                dataset, selected_numeric, lang['correlation'], method=corr_method
+            )
+            st.plotly_chart(fig4, width='stretch')
         else:
             st.info("Select at least 2 numeric columns for correlation analysis")
     
-    with tab5:
+    @st.fragment
+    def categories_tab(dataset, selected_category, selected_numeric):
         # Category Analysis
         if selected_category:
             st.subheader(lang['category_analysis'])
+            frequent = categories.has_frequent_values(dataset, selected_category)
+            if categories.is_high_cardinality(dataset, selected_category):
+                count, _ = categories.cardinality(dataset, selected_category)
+                st.caption(
+                    f"≈{count:,} distinct values: counts are estimated from a sketch "
+                    "and may be slightly low; averages cover the most frequent values"
+                )
+                if not frequent:
+                    st.info(
+                        f"No value of {selected_category} is frequent: "
+                        "the bars show examples, not the most common values"
+                    )
             
             col_cat1, col_cat2 = st.columns(2)
             
             with col_cat1:
                 # Top categories bar chart
-                top_cats = df[selected_category].value_counts().head(10).reset_index()
-                top_cats.columns = [selected_category, 'Count']
-                
-                fig5a = px.bar(
-                    top_cats,
-                    x=selected_category,
-                    y='Count',
-                    title=f"Top 10 {selected_category}",
-                    color='Count',
-                    color_continuous_scale='Viridis'
+                fig5a = charts.top_categories_bar(
+                    dataset,
+                    selected_category,
+                    title=f"Top 10 {selected_category}"
                 )
-                fig5a.update_layout(height=400, xaxis_tickangle=45)
-                st.plotly_chart(fig5a, use_container_width=True)
+                st.plotly_chart(fig5a, width='stretch')
             
             with col_cat2:
                 # Category vs numeric value
-                if selected_numeric:
+                if selected_numeric and not frequent:
+                    st.info(f"No value of {selected_category} occurs often enough to compare averages")
+                elif selected_numeric:
                     num_col = selected_numeric[0]
-                    cat_avg = df.groupby(selected_category)[num_col].mean().reset_index()
-                    cat_avg.columns = [selected_category, f'Avg {num_col}']
-                    cat_avg = cat_avg.sort_values(f'Avg {num_col}', ascending=False).head(10)
-                    
-                    fig5b = px.bar(
-                        cat_avg,
-                        x=selected_category,
-                        y=f'Avg {num_col}',
-                        title=f"Average {num_col} by {selected_category}",
-                        color=f'Avg {num_col}',
-                        color_continuous_scale='Plasma'
+                    fig5b = charts.category_means_bar(
+                        dataset,
+                        selected_category,
+                        num_col,
+                        title=f"Average {num_col} by {selected_category}"
                     )
-                    fig5b.update_layout(height=400, xaxis_tickangle=45)
-                    st.plotly_chart(fig5b, use_container_width=True)
+                    st.plotly_chart(fig5b, width='stretch')
                 else:
                     # Pie chart if no numeric columns
-                    top_cats_pie = df[selected_category].value_counts().head(10).reset_index()
-                    top_cats_pie.columns = [selected_category, 'Count']
-                    
-                    fig_pie = px.pie(
-                        top_cats_pie,
-                        values='Count',
-                        names=selected_category,
-                        title=f"Top 10 {selected_category}",
-                        hole=0.3
+                    fig_pie = charts.top_categories_pie(
+                        dataset,
+                        selected_category,
+                        title=f"Top 10 {selected_category}"
                     )
-                    fig_pie.update_layout(height=400)
-                    st.plotly_chart(fig_pie, use_container_width=True)
+                    st.plotly_chart(fig_pie, width='stretch')
         else:
             st.info("Select a categorical column for category analysis")
     
+    @st.fragment
+    def forecast_tab(dataset, selected_date, selected_numeric, selected_category):
+        # Forecast
+        if selected_date and selected_numeric:
+            st.subheader(lang['forecast'])
+            
+            fc_col1, fc_col2, fc_col3 = st.columns(3)
+            with fc_col1:
+                value_col = st.selectbox("Value:", selected_numeric, key="fc_value")
+                model = st.selectbox("Model:", list(forecast.MODELS), key="fc_model")
+            with fc_col2:
+                fc_frequency = st.selectbox("Frequency:", list(forecast.FREQUENCIES), key="fc_freq")
+                horizon = st.slider("Periods ahead:", 1, 104, 12, key="fc_horizon")
+            with fc_col3:
+                per_category = st.checkbox(
+                    f"Per {selected_category}" if selected_category else "Per category",
+                    disabled=selected_category is None,
+                    key="fc_per_category"
+                )
+            
+            # Every category series is fitted in one pass; refits only on new settings
+            fc_category = selected_category if per_category else None
+            freq = forecast.resolve_frequency(dataset, selected_date, fc_frequency)
+            fitted = forecast.fit(dataset, selected_date, value_col, freq, fc_category, forecast.MODELS[model])
+            if not fitted.labels:
+                st.info("No data to forecast")
+                return
+            
+            if per_category:
+                shown = st.multiselect(
+                    str(selected_category),
+                    fitted.labels,
+                    default=fitted.labels[:3],
+                    key="fc_shown"
+                )
+            else:
+                shown = fitted.labels
+            fc_title = f"{lang['forecast']}: {value_col}"
+            fig6 = charts.cached_figure(
+                dataset,
+                "forecast",
+                (selected_date, value_col, freq, fc_category, forecast.MODELS[model], horizon, tuple(shown), fc_title),
+                lambda: forecast.forecast_figure(fitted, horizon, shown, fc_title)
+            )
+            st.plotly_chart(fig6, width='stretch')
+            
+            if per_category:
+                st.caption(f"{len(fitted.labels):,} series")
+                st.dataframe(forecast.forecast_table(fitted, horizon), width='stretch')
+        else:
+            st.info("Select a date column and numeric columns for forecasting")
+    
+    # Only the open tab is rendered; switching tabs reruns the page with it
+    chart_tabs = [
+        ("📊 Data Types", data_types_tab, (dataset,)),
+        ("📈 Time Series", time_series_tab, (dataset, selected_date, selected_numeric)),
+        ("📊 Distributions", distributions_tab, (dataset, selected_numeric)),
+        ("🔗 Correlations", correlations_tab, (dataset, selected_numeric)),
+        ("🏷️ Categories", categories_tab, (dataset, selected_category, selected_numeric)),
+        (f"🔮 {lang['forecast']}", forecast_tab, (dataset, selected_date, selected_numeric, selected_category))
+    ]
+    tabs = st.tabs(
+        [label for label, _, _ in chart_tabs],
+        key="chart_tab",
+        on_change="rerun"
+    )
+    
+    for tab, (label, render_tab, tab_args) in zip(tabs, chart_tabs):
+        with tab:
+            if tab.open:
+                with profiling.stage(f"tab:{label.split(' ', 1)[1]}"):
+                    render_tab(*tab_args)
+    
     # ===================== DATA DOWNLOAD =====================
     st.markdown("---")
     st.header(f"💾 {lang['download_data']}")
     
-    col_dl1, col_dl2 = st.columns(2)
-    
-    with col_dl1:
-        # CSV Download
-        csv_data = df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📥 Download as CSV",
-            data=csv_data,
-            file_name="processed_data.csv",
-            mime="text/csv",
-            use_container_width=True
-        )
-    
-    with col_dl2:
-        # Excel Download
-        try:
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='openpyxl') as writer:
-                df.to_excel(writer, index=False, sheet_name='Data')
-            excel_data = output.getvalue()
+    # Exports are generated only on request, in the background, and kept per dataset
+    def render_download(fmt, label):
+        mime, file_name = exports.FORMATS[fmt]
+        path = exports.finished_export(dataset, fmt)
+        if path is not None:
+            def read_export():
+                with open(path, 'rb') as export_file:
+                    return export_file.read()
             
+            # Read only when clicked, not on every rerun of every session
             st.download_button(
-                label="📥 Download as Excel",
-                data=excel_data,
-                file_name="processed_data.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True
+                label=label,
+                data=read_export,
+                file_name=file_name,
+                mime=mime,
+                on_click="ignore",
+                width='stretch'
             )
-        except:
-            st.info("Install openpyxl for Excel download")
+            return
+        
+        job = exports.export_job(dataset, fmt)
+        if job is not None and job.error is None:
+            st.progress(job.progress, text=f"{lang['processing']} {job.progress:.0%}")
+            return
+        if job is not None:
+            st.info(f"❌ {lang['error']}: {job.error}")
+        if st.button(f"⚙️ Prepare {fmt.upper()}", key=f"export_{fmt}", width='stretch'):
+            exports.request_export(dataset, fmt)
+            st.rerun()
+    
+    def exports_running():
+        return any(
+            job is not None and job.error is None
+            for job in (exports.export_job(dataset, fmt) for fmt in exports.FORMATS)
+        )
+    
+    def download_section(polling):
+        col_dl1, col_dl2 = st.columns(2)
+        
+        with col_dl1:
+            render_download('csv', "📥 Download as CSV")
+        
+        with col_dl2:
+            render_download('xlsx', "📥 Download as Excel")
+        
+        # Stop polling once the last running export has finished
+        if polling and not exports_running():
+            st.rerun()
+    
+    # Only this section refreshes, once a second, while an export is running
+    polling = exports_running()
+    st.fragment(download_section, run_every=1.0 if polling else None)(polling)
 
 else:
     # Show instructions when no file is uploaded
@@ -547,7 +747,7 @@ else:
         'Region': ['North', 'South', 'North', 'East', 'West']
     }
     sample_df = pd.DataFrame(sample_data)
-    st.dataframe(sample_df, use_container_width=True)
+    st.dataframe(sample_df, width='stretch')
     
     st.markdown("""
     **Ideal data should include:**
@@ -577,3 +777,20 @@ st.markdown("""
     }
 </style>
 """, unsafe_allow_html=True)
+
+# ===================== PERFORMANCE =====================
+profile_report = profiling.finish_run(profile_run)
+if show_performance:
+    with performance_panel.container():
+        st.caption(
+            f"Run: {profile_report['total_seconds']:.3f} s • "
+            f"Peak RSS: {profile_report['peak_rss_mb']:.0f} MB"
+        )
+        if profile_report['stages']:
+            st.dataframe(
+                pd.DataFrame(profile_report['stages']),
+                hide_index=True,
+                width='stretch'
+            )
+        for label, size in profile_report['frames'].items():
+            st.caption(f"{label}: {size['rows']:,} rows × {size['columns']} cols, {size['mb']:.1f} MB")
@@ -0,0 +1,18 @@
+import pytest
+
+from dashboard import aggregates, ingest
+from dashboard.cache import LRUCache
+from dashboard.disk_cache import ColumnarCache, ResultCache
+from dashboard.registry import REGISTRY
+
+
+@pytest.fixture
+def caches(tmp_path, monkeypatch):
+    """Empty in-memory and on-disk caches private to the test."""
+    monkeypatch.setattr(ingest, "DISK_CACHE", ColumnarCache(str(tmp_path / "frames"), 1 << 30))
+    monkeypatch.setattr(aggregates, "AGGREGATE_STORE", ResultCache(str(tmp_path / "aggregates"), 1 << 30))
+    monkeypatch.setattr(aggregates, "AGGREGATE_CACHE", LRUCache(1 << 30))
+    monkeypatch.setattr(aggregates, "INDEX_CACHE", LRUCache(1 << 30))
+    REGISTRY.clear()
+    yield
+    REGISTRY.clear()
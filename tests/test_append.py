@@ -0,0 +1,116 @@
+"""Aggregates carried across an append equal the same aggregates recomputed."""
+import io
+
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+from dashboard import aggregates, categories
+from dashboard.append import _key_hashes, append_rows, key_hashes
+from dashboard.dataset import Dataset
+from dashboard.ingest import load_dataset
+
+pytest.importorskip("openpyxl")
+
+
+def _workbook(df):
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+def _frame(start, n, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Id": np.arange(start, start + n),
+        "Date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 90 * 24, n), unit="h"),
+        "Sales": rng.normal(100, 30, n).round(2),
+        "Quantity": rng.integers(0, 100, n),
+        "Category": rng.choice(["a", "b", "c", "d"], n),
+    })
+
+
+@pytest.fixture
+def history():
+    df = _frame(0, 2000, 0)
+    # Whole rows repeated, which the duplicate count carries over
+    return pd.concat([df, df.iloc[:25]], ignore_index=True)
+
+
+def _sorted(frame):
+    return frame.sort_values(list(frame.columns[:1])).reset_index(drop=True)
+
+
+def test_merged_aggregates_equal_recompute(caches, history):
+    base = load_dataset(_workbook(history), "history.xlsx")
+    params = ("Date", ("Sales", "Quantity"))
+    for freq in ("D", "W", None):
+        aggregates.time_series(base, *params, freq)
+    aggregates.category_counts(base, "Category")
+    aggregates.category_stats(base, "Category", "Sales")
+    aggregates.pairwise_moments(base)
+    aggregates.duplicate_rows(base)
+    categories.category_sketch(base, "Category")
+
+    delta = _frame(1500, 1000, 1)  # 500 rows already in the history
+    merged, added, skipped = append_rows(base, _workbook(delta), "delta.xlsx", ["Id"])
+    assert (added, skipped) == (500, 500)
+    carried = {name for key, name, _ in aggregates.AGGREGATE_CACHE.keys() if key == merged.key}
+    assert carried >= {
+        "time_series", "category_counts", "category_stats", "pairwise_moments", "duplicates", "category_sketch"
+    }
+    fresh = Dataset.from_frame(merged.df.copy())
+
+    for freq in ("D", "W", None):
+        tm.assert_frame_equal(
+            aggregates.time_series(merged, *params, freq), aggregates.time_series(fresh, *params, freq)
+        )
+    tm.assert_frame_equal(
+        aggregates.category_counts(merged, "Category"), aggregates.category_counts(fresh, "Category")
+    )
+    tm.assert_frame_equal(
+        _sorted(aggregates.category_stats(merged, "Category", "Sales")),
+        _sorted(aggregates.category_stats(fresh, "Category", "Sales")),
+        check_exact=False,
+    )
+    numeric = ["Id", "Sales", "Quantity"]
+    tm.assert_frame_equal(
+        aggregates.pairwise_moments(merged).correlation(numeric),
+        aggregates.pairwise_moments(fresh).correlation(numeric),
+        atol=1e-12,
+    )
+    assert aggregates.duplicate_rows(merged) == aggregates.duplicate_rows(fresh) == 25
+    assert merged.summary.rows == fresh.summary.rows == len(history) + 500
+    merged_top = categories.category_sketch(merged, "Category").heavy.top()
+    fresh_top = categories.category_sketch(fresh, "Category").heavy.top()
+    assert list(merged_top[0]) == list(fresh_top[0])
+
+
+def test_reappending_adds_nothing(caches, history):
+    base = load_dataset(_workbook(history), "history.xlsx")
+    delta = _workbook(_frame(2000, 300, 1))
+    merged, added, _ = append_rows(base, delta, "delta.xlsx", ["Id"])
+    assert added == 300
+
+    again, added, skipped = append_rows(merged, delta, "delta.xlsx", ["Id"])
+    assert (added, skipped) == (0, 300)
+    assert again is merged
+
+
+def test_key_widened_by_concatenation(caches, history):
+    base = load_dataset(_workbook(history), "history.xlsx")
+    assert pd.api.types.is_integer_dtype(base.df["Id"].dtype)
+    key_hashes(base, ["Id"])
+
+    # A blank key makes the delta's Id column, and so the appended one, float
+    delta = _frame(2000, 300, 1).astype({"Id": float})
+    delta.loc[0, "Id"] = np.nan
+    merged, added, _ = append_rows(base, _workbook(delta), "delta.xlsx", ["Id"])
+    assert added == 300
+    assert pd.api.types.is_float_dtype(merged.df["Id"].dtype)
+
+    assert (merged.key, "key_hashes", (("Id",),)) in aggregates.INDEX_CACHE  # carried, not rehashed
+    np.testing.assert_array_equal(key_hashes(merged, ["Id"]), np.sort(_key_hashes(merged.df, ["Id"])))
+    _, added, skipped = append_rows(merged, _workbook(history.iloc[:100]), "old.xlsx", ["Id"])
+    assert (added, skipped) == (0, 100)
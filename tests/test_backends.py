@@ -0,0 +1,106 @@
+"""The DuckDB backend returns the same aggregates as the pandas backend."""
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+from dashboard.backends import DuckDBBackend, PandasBackend
+
+pytest.importorskip("duckdb")
+
+FREQUENCIES = [None, "h", "D", "W", "MS", "YS"]
+
+
+@pytest.fixture(scope="module")
+def backends():
+    return PandasBackend(), DuckDBBackend()
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(0)
+    n = 5000
+    df = pd.DataFrame({
+        "Date": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 800 * 24, n), unit="h"),
+        "Sales": rng.normal(100, 30, n).round(2),
+        "Quantity": rng.integers(0, 20, n),
+        "Category": pd.Categorical(rng.choice(["c", "a", "b", "d"], n)),
+        "Region": pd.Series(rng.choice(["North", "South", "East", "West", "Central"], n), dtype="str"),
+        "Flag": rng.random(n) < 0.3,
+    })
+    df.loc[::17, "Sales"] = np.nan
+    df.loc[::23, "Region"] = None
+    df.loc[::31, "Date"] = pd.NaT
+    # Whole-row duplicates
+    return pd.concat([df, df.iloc[:250]], ignore_index=True)
+
+
+def _normalized(result):
+    result = result.reset_index(drop=True)
+    for col in result.columns:
+        if isinstance(result[col].dtype, pd.CategoricalDtype):
+            result[col] = result[col].astype(str)
+        elif pd.api.types.is_datetime64_any_dtype(result[col].dtype):
+            result[col] = result[col].astype("datetime64[ns]")
+        elif pd.api.types.is_numeric_dtype(result[col].dtype) and not pd.api.types.is_bool_dtype(result[col].dtype):
+            result[col] = result[col].astype(np.float64)
+        else:
+            result[col] = result[col].astype(str)
+    return result
+
+
+def _assert_same(pandas_result, duckdb_result, sort_by=None):
+    left, right = _normalized(pandas_result), _normalized(duckdb_result)
+    if sort_by is not None:
+        left = left.sort_values(sort_by, ignore_index=True)
+        right = right.sort_values(sort_by, ignore_index=True)
+    tm.assert_frame_equal(left, right, check_exact=False, rtol=1e-9)
+
+
+@pytest.mark.parametrize("freq", FREQUENCIES)
+def test_group_sum(backends, frame, freq):
+    pandas_backend, duckdb_backend = backends
+    cols = ["Sales", "Quantity", "Flag"]
+    _assert_same(
+        pandas_backend.group_sum(frame, "Date", cols, freq),
+        duckdb_backend.group_sum(frame, "Date", cols, freq),
+    )
+
+
+def test_group_sum_by_category(backends, frame):
+    pandas_backend, duckdb_backend = backends
+    _assert_same(
+        pandas_backend.group_sum(frame, "Region", ["Sales"]),
+        duckdb_backend.group_sum(frame, "Region", ["Sales"]),
+        sort_by="Region",
+    )
+
+
+@pytest.mark.parametrize("col", ["Category", "Region", "Quantity"])
+@pytest.mark.parametrize("n", [None, 3])
+def test_value_counts(backends, frame, col, n):
+    pandas_backend, duckdb_backend = backends
+    _assert_same(pandas_backend.value_counts(frame, col, n), duckdb_backend.value_counts(frame, col, n))
+
+
+def test_value_counts_breaks_ties_by_value(backends):
+    df = pd.DataFrame({"Code": ["z", "y", "x", "z", "y", "x", "w"]})
+    expected = pd.DataFrame({"Code": ["x", "y", "z", "w"], "Count": [2, 2, 2, 1]})
+    for backend in backends:
+        _assert_same(backend.value_counts(df, "Code"), expected)
+
+
+@pytest.mark.parametrize("by", ["Category", "Region"])
+@pytest.mark.parametrize("col", ["Sales", "Quantity"])
+def test_group_stats(backends, frame, by, col):
+    pandas_backend, duckdb_backend = backends
+    _assert_same(
+        pandas_backend.group_stats(frame, by, col),
+        duckdb_backend.group_stats(frame, by, col),
+        sort_by=by,
+    )
+
+
+def test_duplicate_count(backends, frame):
+    pandas_backend, duckdb_backend = backends
+    assert pandas_backend.duplicate_count(frame) == duckdb_backend.duplicate_count(frame) >= 250
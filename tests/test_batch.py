@@ -0,0 +1,55 @@
+"""A precomputed workbook opens from the cache without rescanning or rebuilding."""
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard import aggregates, batch, charts, ingest, streaming
+from dashboard.languages import DEFAULT_LANGUAGE, LANGUAGES
+from dashboard.registry import REGISTRY
+from dashboard.timeseries import resolve_frequency
+
+pytest.importorskip("openpyxl")
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 500
+    df = pd.DataFrame({
+        "Date": pd.date_range("2024-01-01", periods=n, freq="D"),
+        "Sales": rng.normal(100, 30, n).round(2),
+        "Quantity": rng.integers(0, 100, n),
+        "Category": rng.choice(["a", "b", "c"], n),
+    })
+    path = tmp_path / "sales.xlsx"
+    df.to_excel(path, index=False)
+    return str(path)
+
+
+def _fail(*args, **kwargs):
+    raise AssertionError("recomputed")
+
+
+def test_precomputed_workbook_opens_without_recomputing(caches, workbook, monkeypatch):
+    batch.process_workbook(workbook)
+
+    # A fresh process: nothing in memory, only the disk caches
+    aggregates.AGGREGATE_CACHE.clear()
+    REGISTRY.clear()
+    with open(workbook, 'rb') as f:
+        data = f.read()
+    monkeypatch.setattr(ingest, "parse_sheet", _fail)
+    monkeypatch.setattr(streaming.RunningSummary, "from_frame", _fail)
+    monkeypatch.setattr(charts.pio, "to_json", _fail)
+    dataset = ingest.load_dataset(io.BytesIO(data), "sales.xlsx")
+
+    assert dataset.summary.rows == 500
+    lang = LANGUAGES[DEFAULT_LANGUAGE]
+    charts.dtype_pie(dataset, lang['data_types'])
+    freq = resolve_frequency(dataset, "Date", "Auto")
+    charts.time_series_figure(dataset, "Date", ["Sales", "Quantity"], freq, f"{lang['trend']} Analysis")
+    charts.histogram(dataset, "Sales", "Histogram of Sales")
+    charts.correlation_heatmap(dataset, ["Sales", "Quantity"], lang['correlation'])
+    charts.category_means_bar(dataset, "Category", "Sales", "Average Sales by Category")
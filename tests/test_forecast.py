@@ -0,0 +1,32 @@
+"""Holt-Winters recovers a known trend and season."""
+import numpy as np
+import pandas as pd
+
+from dashboard.forecast import Fit, _holt_winters, predict
+
+
+def _fit(y, m, freq):
+    periods = pd.date_range("2021-01-01", periods=y.shape[1], freq=freq)
+    labels = list(range(len(y)))
+    return Fit("holt_winters", freq, periods, labels, y, *_holt_winters(y, m))
+
+
+def test_linear_series_continues_its_trend():
+    result = _fit(np.arange(36, dtype=float)[None, :], 12, "MS")
+    _, values = predict(result, 12)
+    np.testing.assert_allclose(values[0], np.arange(36, 48), atol=1e-9)
+
+
+def test_trend_and_season_are_projected():
+    m, n, horizon = 12, 48, 24
+    t = np.arange(n + horizon)
+    slopes = np.array([0.0, 1.5, -2.0, 10.0])
+    shapes = np.sin(2 * np.pi * t / m) * np.array([[5.0], [20.0], [3.0], [50.0]])
+    panel = 100 + slopes[:, None] * t + shapes
+    result = _fit(panel[:, :n], m, "MS")
+
+    future, values = predict(result, horizon)
+    assert future[0] == result.periods[-1] + pd.offsets.MonthBegin()
+    np.testing.assert_allclose(values, panel[:, n:], atol=1e-6)
+    np.testing.assert_allclose(result.trend, slopes, atol=1e-9)
+    np.testing.assert_allclose(result.rmse, 0, atol=1e-6)
@@ -0,0 +1,23 @@
+"""Date formats are chosen from a column's own values."""
+import pandas as pd
+
+from dashboard.schema import infer_schema
+
+
+def _format(values):
+    return infer_schema(pd.DataFrame({"Date": values})).conversions.get("Date")
+
+
+def test_date_format_does_not_depend_on_earlier_uploads():
+    month_first = pd.date_range("2024-01-01", periods=60).strftime("%m/%d/%Y")
+    day_first = pd.date_range("2024-01-01", periods=60).strftime("%d/%m/%Y")
+    assert _format(month_first) == "datetime:%m/%d/%Y"
+    assert _format(day_first) == "datetime:%d/%m/%Y"
+    assert _format(month_first) == "datetime:%m/%d/%Y"
+
+
+def test_best_format_wins_over_first_guess():
+    # Nearly every value reads either way; a few only day first
+    days = [(m, d) for m in range(1, 13) for d in range(1, 13)] + [(m, 20) for m in range(1, 5)]
+    values = [f"{d:02d}/{m:02d}/2024" for m, d in days]
+    assert _format(values) == "datetime:%d/%m/%Y"
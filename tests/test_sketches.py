@@ -0,0 +1,112 @@
+"""Sketches and streaming moments against exact computations."""
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+from dashboard.sketches import HeavyHitters, HyperLogLog, hash_values
+from dashboard.streaming import PairwiseMoments
+
+
+def _hll(series):
+    return HyperLogLog().update(hash_values(series))
+
+
+def _heavy(series, capacity):
+    return HeavyHitters(capacity).update(hash_values(series), series)
+
+
+@pytest.mark.parametrize("distinct", [10, 1_000, 200_000])
+def test_hyperloglog_estimate_error(distinct):
+    series = pd.Series([f"id{i}" for i in range(distinct)] * 2)
+    estimate = _hll(series).count()
+    # 0.8% standard error; allow four of them
+    assert abs(estimate - distinct) <= max(0.032 * distinct, 1)
+
+
+def test_hyperloglog_merge_equals_single_pass():
+    series = pd.Series(np.random.default_rng(0).integers(0, 50_000, 200_000))
+    merged = _hll(series.iloc[:70_000]).merge(_hll(series.iloc[70_000:]))
+    np.testing.assert_array_equal(merged.registers, _hll(series).registers)
+    assert merged.count() == _hll(series).count()
+
+
+@pytest.fixture(scope="module")
+def skewed():
+    rng = np.random.default_rng(1)
+    # Ten common values over a long tail of rare ones
+    common = rng.choice([f"top{i}" for i in range(10)], 50_000, p=np.linspace(2, 1, 10) / 15)
+    tail = [f"rare{i}" for i in rng.integers(0, 100_000, 150_000)]
+    return pd.Series(np.concatenate([common, tail])).sample(frac=1, random_state=2).reset_index(drop=True)
+
+
+def _check_bounds(heavy, series):
+    exact = series.value_counts()
+    values, counts = heavy.top()
+    true = exact.loc[values].to_numpy()
+    assert (counts <= true).all()
+    assert (true - counts <= heavy.error).all()
+    # Nothing left untracked occurs more often than the error allows
+    assert exact.drop(values).max() <= heavy.error
+
+
+def test_heavy_hitters_find_frequent_values(skewed):
+    heavy = HeavyHitters(100)
+    for start in range(0, len(skewed), 20_000):
+        part = skewed.iloc[start:start + 20_000]
+        heavy.update(hash_values(part), part)
+    _check_bounds(heavy, skewed)
+    assert set(heavy.frequent()) == {f"top{i}" for i in range(10)}
+    assert list(heavy.top(10)[0]) == list(skewed.value_counts().index[:10])
+
+
+def test_heavy_hitters_merge(skewed):
+    parts = [skewed.iloc[start:start + 40_000] for start in range(0, len(skewed), 40_000)]
+    merged = _heavy(parts[0], 100)
+    for part in parts[1:]:
+        merged.merge(_heavy(part, 100))
+    assert merged.total == len(skewed)
+    _check_bounds(merged, skewed)
+    assert set(merged.frequent()) == {f"top{i}" for i in range(10)}
+
+
+def test_heavy_hitters_keep_unique_values():
+    series = pd.Series([f"txn{i}" for i in range(200_000)])
+    heavy = HeavyHitters(1000)
+    for start in range(0, len(series), 50_000):
+        part = series.iloc[start:start + 50_000]
+        heavy.update(hash_values(part), part)
+    values, counts = heavy.top(10)
+    assert len(values) == 10 and (counts == 1).all()
+    assert not len(heavy.frequent())
+
+
+@pytest.fixture(scope="module")
+def numbers():
+    rng = np.random.default_rng(3)
+    n = 5000
+    x = rng.normal(1e6, 1, n)
+    df = pd.DataFrame({
+        "x": x,
+        "y": 2 * x + rng.normal(0, 1, n),
+        "z": rng.integers(0, 10, n).astype(float),
+        "w": -x + rng.normal(0, 3, n),
+    })
+    df.loc[rng.choice(n, 400, replace=False), "y"] = np.nan
+    df.loc[rng.choice(n, 300, replace=False), "z"] = np.nan
+    return df
+
+
+def test_pairwise_moments_match_pandas(numbers):
+    moments = PairwiseMoments.from_frame(numbers, list(numbers.columns), chunk_rows=700)
+    tm.assert_frame_equal(moments.correlation(list(numbers.columns)), numbers.corr(), atol=1e-9)
+
+
+def test_pairwise_moments_merge_equals_single_pass(numbers):
+    columns = list(numbers.columns)
+    whole = PairwiseMoments.from_frame(numbers, columns)
+    first = PairwiseMoments(columns, whole.shift).update(numbers.iloc[:1234])
+    first.merge(PairwiseMoments(columns, whole.shift).update(numbers.iloc[1234:]))
+    tm.assert_frame_equal(first.correlation(columns), whole.correlation(columns), atol=1e-12)
+    with pytest.raises(ValueError):
+        first.merge(PairwiseMoments(columns, whole.shift + 1))
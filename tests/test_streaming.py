@@ -0,0 +1,66 @@
+"""A streamed workbook is typed exactly as one parsed by ``pd.read_excel``."""
+import io
+
+import numpy as np
+import pandas as pd
+import pandas.testing as tm
+import pytest
+
+from dashboard.ingest import parse_sheet
+from dashboard.streaming import read_workbook_chunked
+
+pytest.importorskip("openpyxl")
+
+
+@pytest.fixture(scope="module")
+def workbook():
+    from openpyxl import load_workbook
+
+    rng = np.random.default_rng(0)
+    n = 3000
+    df = pd.DataFrame({
+        "Sales": rng.normal(100, 30, n).round(2),
+        "Quantity": rng.integers(0, 100, n).astype(float),
+        # Numbers stored as text
+        "Price": [f"{value:.2f}" for value in rng.random(n)],
+        "Code": [f"{i:03d}" for i in range(n)],
+        # Numbers as text until a chunk near the end
+        "Ref": [str(i) for i in range(n - 1)] + ["pending"],
+        # Blank for the first chunks
+        "Discount": [None] * 2000 + list(rng.random(1000)),
+        "Note": [None] * 2000 + ["x", "y"] * 500,
+        "Date": pd.date_range("2024-01-01", periods=n, freq="h"),
+        "DateStr": pd.date_range("2024-01-01", periods=n).strftime("%d/%m/%Y"),
+        "Category": rng.choice(["a", "b", "c"], n),
+        "Id": [f"id{i}" for i in range(n)],
+        "Flag": rng.random(n) < 0.5,
+        "Status": ["NA" if i % 7 else "ok" for i in range(n)],
+    })
+    df.loc[100, "Quantity"] = None
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+
+    # A blank row in the middle of the data
+    book = load_workbook(io.BytesIO(buffer.getvalue()))
+    book.active.insert_rows(1500)
+    buffer = io.BytesIO()
+    book.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("chunk_rows", [700, 5000])
+def test_streamed_matches_read_excel(workbook, chunk_rows):
+    expected, summary = parse_sheet(workbook, "sheet.xlsx")
+    assert summary is None  # small enough for read_excel
+
+    streamed, summary = read_workbook_chunked(workbook, chunk_rows=chunk_rows)
+    tm.assert_frame_equal(streamed, expected)
+    assert summary.rows == len(expected)
+    assert summary.missing == int(expected.isna().sum().sum())
+
+
+def test_numbers_stored_as_text_are_numeric(workbook):
+    streamed, _ = read_workbook_chunked(workbook, chunk_rows=700)
+    for col in ["Price", "Code", "Discount"]:
+        assert pd.api.types.is_numeric_dtype(streamed[col].dtype), col
+    assert not pd.api.types.is_numeric_dtype(streamed["Ref"].dtype)